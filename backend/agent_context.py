@@ -0,0 +1,104 @@
+"""Bounded per-session conversation context for agent LLM calls.
+
+Agents send every call on a fresh LLM session, so nothing accumulates inside
+the SDK. Continuity within a user's chat session is kept here instead: up to
+max_turns recent turns within a token budget, with older turns folded into a
+short running summary. The active session comes from the `agent_context_key`
+context variable, which endpoints set around the work they do for a session.
+"""
+import contextlib
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from caching import TTLCache
+
+agent_context_key: ContextVar[Optional[str]] = ContextVar("agent_context_key", default=None)
+
+
+@contextlib.contextmanager
+def agent_context(key: Optional[str]) -> Iterator[None]:
+    """Attribute agent LLM calls made inside the block (and tasks it creates) to a session"""
+    token = agent_context_key.set(key)
+    try:
+        yield
+    finally:
+        agent_context_key.reset(token)
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English prose and JSON
+    return (len(text) + 3) // 4
+
+
+class AgentContext:
+    """Recent (prompt, reply) turns for one agent in one session, kept within a turn and token budget"""
+
+    def __init__(self, max_turns: int, max_tokens: int, summary_tokens: int):
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.turns: Deque[Tuple[str, str]] = deque()
+        self.summary = ""
+        self.evicted = 0
+
+    def tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(estimate_tokens(p) + estimate_tokens(r) for p, r in self.turns)
+
+    def add(self, prompt: str, reply: str):
+        self.turns.append((prompt, reply))
+        while self.turns and (len(self.turns) > self.max_turns or self.tokens() > self.max_tokens):
+            self._fold(*self.turns.popleft())
+
+    def _fold(self, prompt: str, reply: str):
+        # Keep the start of the evicted reply; the summary itself is capped
+        # (oldest text dropped first) so it cannot grow the prompt either
+        gist = reply.strip().splitlines()[0][:160] if reply.strip() else ""
+        self.summary = f"{self.summary} {gist}".strip()[-self.summary_tokens * 4:]
+        self.evicted += 1
+
+    def render(self) -> str:
+        parts = []
+        if self.summary:
+            parts.append(f"Earlier in this session (summary): {self.summary}")
+        for prompt, reply in self.turns:
+            parts.append(f"Previous request: {prompt.strip()}\nYour previous answer: {reply.strip()}")
+        return "\n\n".join(parts)
+
+
+class AgentContextStore:
+    """Session contexts keyed on (session, agent), expiring after ttl seconds without use.
+
+    max_turns=0 disables history: every call is stateless.
+    """
+
+    def __init__(self, max_turns: int = 0, max_tokens: int = 1500, summary_tokens: int = 100,
+                 ttl: float = 1800.0, max_sessions: int = 1000):
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self._contexts = TTLCache(ttl=ttl, max_size=max_sessions)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_turns > 0
+
+    def get(self, agent: str) -> Optional[AgentContext]:
+        """Context of the current session for agent, or None when there is no session"""
+        key = agent_context_key.get()
+        if not self.enabled or key is None:
+            return None
+        context = self._contexts.get((key, agent))
+        if context is None:
+            context = AgentContext(self.max_turns, self.max_tokens, self.summary_tokens)
+        # Re-setting refreshes the expiry, so active sessions are kept
+        self._contexts.set((key, agent), context)
+        return context
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_turns": self.max_turns,
+            "max_tokens": self.max_tokens,
+            **self._contexts.stats(),
+        }
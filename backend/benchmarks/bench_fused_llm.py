@@ -0,0 +1,145 @@
+"""Fused versus per-agent LLM calls for research.
+
+Runs the same research requests (every agent in llm mode) once with each
+LLM-backed agent calling the model itself and once with a single fused call,
+against the stub LLM and fake CoinGecko from load_test.py. Caches are
+disabled so every request reaches the model. Reports latency, LLM round
+trips, estimated prompt tokens, dispatcher queue wait and fallbacks.
+
+Usage (from backend/):
+    python benchmarks/bench_fused_llm.py --requests 200 --concurrency 16
+    python benchmarks/bench_fused_llm.py --llm-latency 0.8 --llm-bad-json-rate 0.1 --env LLM_RATE_LIMITS=openai/gpt-4o-mini=120
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from load_test import BACKEND_DIR, fake_coingecko, free_port, install_llm_stub, summarize  # noqa: E402
+from llm_dispatch import LLMDispatcher  # noqa: E402
+
+PROMPT_AGENTS = ("Sentiment", "Technical", "Fused")
+
+
+def counters(server):
+    return {
+        "prompt_tokens": sum(server.llm_prompt_tokens.labels(agent).sum for agent in PROMPT_AGENTS),
+        "fallbacks": server.fallbacks.labels("fused_validation").value,
+    }
+
+
+def fresh_dispatcher(server):
+    """Same configuration, zeroed stats and rate-limit buckets"""
+    d = server.llm_dispatcher
+    server.llm_dispatcher = LLMDispatcher(d.concurrency, d.rate_limits, d.default_rpm, d.burst,
+                                          d.max_retries, d.backoff_base, d.backoff_max)
+
+
+async def run_mode(server, fused: bool, assets, requests: int, concurrency: int):
+    issued = itertools.count()
+    cycle = itertools.cycle(assets)
+    latencies, statuses = [], Counter()
+    fresh_dispatcher(server)
+    before = counters(server)
+
+    async def worker():
+        while next(issued) < requests:
+            query = server.ResearchQuery(query="bench", asset=next(cycle), agent_mode="llm", fused=fused)
+            started = time.perf_counter()
+            try:
+                await server.compute_research(query)
+                statuses[200] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, statuses, time.perf_counter() - started)
+    after = counters(server)
+    result.update({key: round(after[key] - before[key], 1) for key in after})
+    models = list(server.llm_dispatcher.stats()["models"].values())
+    result["llm_calls"] = sum(m["calls"] + m["errors"] for m in models)
+    result["llm_calls_per_request"] = round(result["llm_calls"] / requests, 2)
+    result["prompt_tokens_per_request"] = round(result["prompt_tokens"] / requests, 1)
+    result["avg_queue_wait_ms"] = max((m["avg_queue_wait_ms"] for m in models), default=0.0)
+    return result
+
+
+async def run(args):
+    random.seed(args.seed)
+    upstream_port = free_port()
+    runner = web.AppRunner(fake_coingecko(0.0, 0.0), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", upstream_port).start()
+
+    install_llm_stub(args.llm_latency, args.llm_sigma, 0.0, args.llm_bad_json_rate)
+    db_name = f"juno_bench_{uuid.uuid4().hex[:8]}"
+    os.environ.update({
+        "MONGO_URL": "mongodb://127.0.0.1:27017",
+        "DB_NAME": db_name,
+        "COINGECKO_BASE_URL": f"http://127.0.0.1:{upstream_port}",
+        "EMERGENT_LLM_KEY": "stub",
+        "PRECOMPUTE_ENABLED": "false",
+        "CANDLE_BACKFILL_EVERY": "0",
+        "LLM_CACHE_TTL": "0",
+        "RESEARCH_CACHE_TTL": "0",
+    })
+    for item in args.env:
+        key, _, value = item.partition("=")
+        os.environ[key] = value
+
+    import server
+    from mongomock_motor import AsyncMongoMockClient
+    server.client = AsyncMongoMockClient()
+    server.db = server.client[db_name]
+
+    with open(BACKEND_DIR / "data" / "coin_list.json") as f:
+        assets = [coin["symbol"].upper() for coin in json.load(f)[:args.assets]]
+
+    await server.app.router.startup()
+    try:
+        # Warm the candle store so both modes start from the same state
+        for asset in assets:
+            await server.compute_research(server.ResearchQuery(query="warm", asset=asset))
+        results = {}
+        for name, fused in (("per_agent", False), ("fused", True)):
+            results[name] = await run_mode(server, fused, assets, args.requests, args.concurrency)
+    finally:
+        await server.app.router.shutdown()
+        await runner.cleanup()
+
+    columns = ("p50_ms", "p95_ms", "throughput_rps", "llm_calls_per_request", "prompt_tokens_per_request",
+               "avg_queue_wait_ms", "fallbacks")
+    print(f"{'mode':<10}" + "".join(f"{c:>{len(c) + 2}}" for c in columns))
+    for name, r in results.items():
+        print(f"{name:<10}" + "".join(f"{r[c]:>{len(c) + 2}}" for c in columns))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="median stub LLM latency (s)")
+    parser.add_argument("--llm-sigma", type=float, default=0.3)
+    parser.add_argument("--llm-bad-json-rate", type=float, default=0.0)
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE applied before server import")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
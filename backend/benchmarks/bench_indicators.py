@@ -0,0 +1,74 @@
+"""Microbenchmark for the indicator engine on multi-year minute candles.
+
+Usage (from backend/):
+    python benchmarks/bench_indicators.py --years 3 --updates 10000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from indicators import IndicatorEngine, ema  # noqa: E402
+
+
+def synthetic_minute_candles(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    close = 30000.0 * np.exp(np.cumsum(rng.normal(0.0, 0.0008, n)))
+    wick = np.abs(rng.normal(0.0, 0.0005, (2, n)))
+    return close * (1.0 + wick[0]), close * (1.0 - wick[1]), close
+
+
+def python_ema(values, period):
+    alpha = 2.0 / (period + 1)
+    out = [values[0]]
+    for v in values[1:]:
+        out.append(out[-1] + alpha * (v - out[-1]))
+    return out
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=float, default=3.0)
+    parser.add_argument("--updates", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    n = int(args.years * 365 * 24 * 60)
+    high, low, close = synthetic_minute_candles(n + args.updates)
+    engine = IndicatorEngine()
+
+    full = timed(lambda: engine.compute(high[:n], low[:n], close[:n]), args.repeat)
+    _, state = engine.compute(high[:n], low[:n], close[:n])
+
+    def incremental():
+        s = state
+        for i in range(n, n + args.updates):
+            s = engine.update(s, high[i], low[i], close[i])
+        engine.snapshot(s)
+
+    inc = timed(incremental, 1)
+    vec_ema = timed(lambda: ema(close[:n], 200), args.repeat)
+    py_ema = timed(lambda: python_ema(close[:n].tolist(), 200), 1)
+
+    print(f"candles:                      {n:,}")
+    print(f"full compute (all indicators): {full * 1000:10.1f} ms")
+    print(f"incremental update:            {inc / args.updates * 1e6:10.1f} us/candle")
+    print(f"EMA(200) vectorized:           {vec_ema * 1000:10.1f} ms")
+    print(f"EMA(200) pure Python loop:     {py_ema * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
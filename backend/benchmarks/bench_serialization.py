@@ -0,0 +1,122 @@
+"""Microbenchmark for encoding research, chat and history payloads.
+
+Compares the FastAPI default paths the routes used before (response_model
+validation plus JSONResponse, or jsonable_encoder for untyped returns, and
+ChatMessage models rebuilt from every history document) with FastJSONResponse
+over model_dump / trusted Mongo dicts, then reports compressed sizes and
+compression time for a full history page.
+
+Usage (from backend/):
+    python benchmarks/bench_serialization.py --messages 100 --repeat 200
+"""
+import argparse
+import gzip
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+import server  # noqa: E402
+from compression import brotli  # noqa: E402
+from serialization import FastJSONResponse  # noqa: E402
+
+
+def sample_research(asset: str, rng: random.Random) -> server.ResearchResponse:
+    price = rng.uniform(55000, 70000)
+    evidence = [
+        server.AgentEvidence(
+            agent=name, score=round(rng.uniform(-2, 2), 3), confidence=rng.randint(30, 90),
+            highlights=[f"{name} signal {i} for {asset}: {rng.uniform(-10, 10):.2f}% vs {rng.uniform(0, 100):.1f}"
+                        for i in range(4)],
+            sources=["CoinGecko", "Price Action", "LLM review"],
+            levels={"support": [round(price * rng.uniform(0.9, 0.99), 2) for _ in range(2)],
+                    "resistance": [round(price * rng.uniform(1.01, 1.1), 2) for _ in range(2)]},
+        )
+        for name in ("Sentiment", "Technical", "Macro", "On-Chain")
+    ]
+    view = server.build_market_view(asset, "1d", evidence)
+    return server.ResearchResponse(
+        summary=server.build_summary(view, []),
+        market_view=view,
+        recommendations=server.build_recommendations(server.ResearchQuery(query="bench", asset=asset), {"usd": price}),
+        agent_evidence=evidence,
+        disclosures=server.RESEARCH_DISCLOSURES,
+    )
+
+
+def history_documents(count: int, rng: random.Random):
+    """Chat messages as get_chat_history reads them: Mongo dicts with resolved research"""
+    started = datetime(2026, 1, 1)
+    docs = []
+    for i in range(count):
+        research = server.research_document(sample_research("BTC", rng))
+        docs.append({
+            "id": str(uuid.uuid4()),
+            "session_id": "bench",
+            "user_id": "anonymous",
+            "message": f"How does BTC look this week? ({i})",
+            "research_id": research["id"],
+            "created_at": started + timedelta(minutes=i),
+            "response": {**research, "disclosures": server.RESEARCH_DISCLOSURES},
+        })
+    return docs
+
+
+def timed(fn, repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100, help="history page size")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    research = sample_research("BTC", rng)
+    research_field = next(r.response_field for r in server.app.routes if getattr(r, "path", "") == "/api/research")
+    chat = {"response": research, "session_id": str(uuid.uuid4()), "assets": ["BTC"]}
+    docs = history_documents(args.messages, rng)
+
+    def research_before():
+        # What serialize_response does for a response_model route
+        value, _ = research_field.validate(research, {}, loc=("response",))
+        return JSONResponse(research_field.serialize(value, mode="json")).body
+
+    cases = [
+        ("research", research_before,
+         lambda: FastJSONResponse(research).body),
+        ("chat", lambda: JSONResponse(jsonable_encoder(chat)).body,
+         lambda: FastJSONResponse(chat).body),
+        (f"history x{args.messages}", lambda: JSONResponse(jsonable_encoder([server.ChatMessage(**d) for d in docs])).body,
+         lambda: FastJSONResponse([server.stored_chat_message(d) for d in docs]).body),
+    ]
+    print(f"{'payload':<14}{'bytes':>9}{'before ms':>11}{'after ms':>10}{'speedup':>9}")
+    for name, before, after in cases:
+        t_before, t_after = timed(before, args.repeat), timed(after, args.repeat)
+        print(f"{name:<14}{len(after()):>9}{t_before:>11.3f}{t_after:>10.3f}{t_before / t_after:>8.1f}x")
+
+    body = FastJSONResponse([server.stored_chat_message(d) for d in docs]).body
+    codecs = [(f"gzip-{level}", lambda level=level: gzip.compress(body, compresslevel=level)) for level in (1, 6, 9)]
+    if brotli is not None:
+        codecs += [(f"br-{q}", lambda q=q: brotli.compress(body, quality=q)) for q in (1, 4, 6)]
+    print(f"\nhistory page {len(body)} bytes")
+    print(f"{'codec':<10}{'bytes':>9}{'ratio':>8}{'ms':>8}")
+    for name, fn in codecs:
+        size = len(fn())
+        print(f"{name:<10}{size:>9}{size / len(body):>8.3f}{timed(fn, max(1, args.repeat // 10)):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
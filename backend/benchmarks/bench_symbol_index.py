@@ -0,0 +1,81 @@
+"""Microbenchmark for asset extraction from long chat messages.
+
+Compares the Aho-Corasick symbol index against scanning the message once per
+known ticker/name with a word-boundary regex.
+
+Usage (from backend/):
+    python benchmarks/bench_symbol_index.py --chars 100000 --repeat 5
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from symbol_index import SymbolIndex  # noqa: E402
+
+FILLER = (
+    "the market looks choppy today and i am wondering whether to hold or rotate into something "
+    "with better momentum before the weekly close while funding stays neutral and volume is thin"
+).split()
+
+
+def synthetic_message(index: SymbolIndex, chars: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    terms = [term for term, _, _ in index._patterns]
+    words, size = [], 0
+    while size < chars:
+        word = rng.choice(terms).upper() if rng.random() < 0.05 else rng.choice(FILLER)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def naive_find(patterns, text):
+    found = {}
+    for term, regex in patterns:
+        match = regex.search(text)
+        if match:
+            found.setdefault(term, match.start())
+    return sorted(found, key=found.get)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chars", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    index = SymbolIndex()
+    build = timed(index.build, args.repeat)
+    text = synthetic_message(index, args.chars)
+    short = "what do you think about $SOL vs ETH and bitcoin this week?"
+    patterns = [(term, re.compile(r"(?<!\w)" + re.escape(term) + r"(?!\w)", re.IGNORECASE))
+                for term, _, _ in index._patterns]
+
+    indexed = timed(lambda: index.find(text), args.repeat)
+    naive = timed(lambda: naive_find(patterns, text), args.repeat)
+    short_indexed = timed(lambda: [index.find(short) for _ in range(1000)], args.repeat) / 1000
+
+    print(f"coins / patterns:            {index.coins:,} / {len(patterns):,}")
+    print(f"index build:                 {build * 1000:10.2f} ms")
+    print(f"message length:              {len(text):,} chars, {len(index.find(text))} distinct assets")
+    print(f"symbol index (one pass):     {indexed * 1000:10.2f} ms")
+    print(f"regex per pattern:           {naive * 1000:10.2f} ms")
+    print(f"short message, symbol index: {short_indexed * 1e6:10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
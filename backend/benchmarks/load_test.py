@@ -0,0 +1,388 @@
+"""Offline load test for the Juno API.
+
+Boots server.app in-process under uvicorn against local stand-ins:
+  - a fake CoinGecko (aiohttp.web on localhost, wired in via COINGECKO_BASE_URL)
+  - a stub LlmChat with configurable latency, error rate and malformed replies
+  - Mongo: --mongo-url for a local server, otherwise mongomock-motor in memory
+then drives the selected scenarios at a fixed concurrency and reports
+p50/p95/p99 latency and throughput. Results are written as JSON so runs can
+be compared with --compare.
+
+Usage (from backend/):
+    python benchmarks/load_test.py --concurrency 32 --requests 500
+    python benchmarks/load_test.py --scenarios research,chat --llm-latency 0.8 --llm-error-rate 0.05
+    python benchmarks/load_test.py --env RESEARCH_CACHE_TTL=0 --compare benchmarks/results/load-previous.json
+    python benchmarks/load_test.py --scenarios market,research --incident --env PRICE_CACHE_TTL=1
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import types
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import aiohttp
+import numpy as np
+from aiohttp import web
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+SCENARIOS = ("market", "research", "chat", "history", "batch")
+
+# CoinGecko /ohlc picks the candle length from `days`
+OHLC_GRANULARITY = ((1, 1800), (30, 14400), (float("inf"), 345600))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def base_price(coin_id: str) -> float:
+    digest = int(hashlib.sha1(coin_id.encode()).hexdigest()[:8], 16)
+    return 10 ** (digest % 600 / 100 - 1)  # 0.1 .. 1e5
+
+
+# Fake CoinGecko
+
+def fake_coingecko(latency: float, error_rate: float, incident: Optional[dict] = None) -> web.Application:
+    """incident, when given, is a shared {"active": bool, "latency": s}; while active every request hangs"""
+    async def delay():
+        if incident and incident["active"]:
+            await asyncio.sleep(incident["latency"])
+        if latency > 0:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * latency)
+
+    async def simple_price(request: web.Request):
+        await delay()
+        if random.random() < error_rate:
+            return web.json_response({"status": {"error_code": 429, "error_message": "rate limited"}}, status=429)
+        quotes = {}
+        for coin_id in request.query.get("ids", "").split(","):
+            if not coin_id:
+                continue
+            price = base_price(coin_id) * (1 + random.gauss(0, 0.002))
+            quotes[coin_id] = {
+                "usd": price,
+                "usd_market_cap": price * 1e8,
+                "usd_24h_vol": price * 1e6,
+                "usd_24h_change": random.gauss(0, 3),
+            }
+        return web.json_response(quotes)
+
+    async def ohlc(request: web.Request):
+        await delay()
+        if random.random() < error_rate:
+            return web.json_response({"status": {"error_code": 429, "error_message": "rate limited"}}, status=429)
+        days = int(request.query.get("days", "30"))
+        step = next(seconds for limit, seconds in OHLC_GRANULARITY if days <= limit)
+        count = max(1, days * 86400 // step)
+        now_ms = int(time.time() // step * step * 1000)
+        rng = np.random.default_rng(int(hashlib.sha1(request.match_info["coin_id"].encode()).hexdigest()[:8], 16))
+        close = base_price(request.match_info["coin_id"]) * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+        rows = [
+            [now_ms - (count - 1 - i) * step * 1000, float(c * 0.998), float(c * 1.01), float(c * 0.99), float(c)]
+            for i, c in enumerate(close)
+        ]
+        return web.json_response(rows)
+
+    app = web.Application()
+    app.router.add_get("/simple/price", simple_price)
+    app.router.add_get("/coins/{coin_id}/ohlc", ohlc)
+    return app
+
+
+# Stub LLM
+
+FUSED_KEYS = re.compile(r"^Top-level keys: (.+)$", re.MULTILINE)
+
+def install_llm_stub(latency: float, sigma: float, error_rate: float, bad_json_rate: float):
+    """Register a stand-in emergentintegrations.llm.chat module before server is imported.
+
+    Latency is log-normal with the given median; error_rate raises, and
+    bad_json_rate returns prose so the agents' JSON fallbacks are exercised.
+    Fused multi-agent prompts get one answer section per agent.
+    """
+    def stub_answer():
+        return {
+            "score": round(random.uniform(-1.5, 1.5), 2),
+            "confidence": random.randint(40, 80),
+            "highlights": ["Stub model view"],
+            "sources": ["stub"],
+            "levels": {"support": [100.0], "resistance": [120.0]},
+            "patterns": ["range"],
+        }
+
+    class UserMessage:
+        def __init__(self, text: str):
+            self.text = text
+
+    class LlmChat:
+        def __init__(self, api_key=None, session_id="", system_message="", **kwargs):
+            self.session_id = session_id
+            self.system_message = system_message
+
+        def with_model(self, provider: str, model: str):
+            self.provider, self.model = provider, model
+            return self
+
+        async def send_message(self, message: UserMessage) -> str:
+            if latency > 0:
+                await asyncio.sleep(random.lognormvariate(math.log(latency), sigma))
+            if random.random() < error_rate:
+                raise RuntimeError("stub LLM error")
+            if random.random() < bad_json_rate:
+                return "The market looks balanced; no strong view either way."
+            # Fused prompts name their sections; answer each one
+            sections = FUSED_KEYS.search(message.text)
+            if sections:
+                return json.dumps({name.strip(): stub_answer() for name in sections.group(1).split(",")})
+            return json.dumps(stub_answer())
+
+    chat = types.ModuleType("emergentintegrations.llm.chat")
+    chat.LlmChat, chat.UserMessage = LlmChat, UserMessage
+    llm = types.ModuleType("emergentintegrations.llm")
+    llm.chat = chat
+    package = types.ModuleType("emergentintegrations")
+    package.llm = llm
+    sys.modules.update({
+        "emergentintegrations": package,
+        "emergentintegrations.llm": llm,
+        "emergentintegrations.llm.chat": chat,
+    })
+
+
+# Load driver
+
+def summarize(latencies, statuses: Counter, elapsed: float):
+    ok = sum(count for status, count in statuses.items() if isinstance(status, int) and status < 400)
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "requests": len(latencies),
+        "ok": ok,
+        "errors": len(latencies) - ok,
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(float(ms.mean()), 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+async def drive(session: aiohttp.ClientSession, base_url: str, make_request, total: int, concurrency: int):
+    latencies, statuses = [], Counter()
+    issued = itertools.count()
+
+    async def worker():
+        while next(issued) < total:
+            method, path, kwargs = make_request()
+            started = time.perf_counter()
+            try:
+                async with session.request(method, base_url + path, **kwargs) as response:
+                    await response.read()
+                    statuses[response.status] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+def request_factories(assets, sessions, batch_size: int):
+    def market():
+        return "GET", "/api/market", {"params": {"assets": ",".join(random.sample(assets, random.randint(1, 5)))}}
+
+    def research():
+        return "POST", "/api/research", {"json": {"query": "load test", "asset": random.choice(assets)}}
+
+    def chat():
+        a, b = random.sample(assets, 2)
+        return "POST", "/api/chat", {"json": {"message": f"How do {a} and {b} look this week?",
+                                              "session_id": random.choice(sessions)}}
+
+    def history():
+        return "GET", f"/api/chat/history/{random.choice(sessions)}", {"params": {"limit": "20"}}
+
+    def batch():
+        return "POST", "/api/research/batch", {"json": {"assets": random.sample(assets, batch_size)}}
+
+    return {"market": market, "research": research, "chat": chat, "history": history, "batch": batch}
+
+
+def compare(current, previous_path: Path):
+    previous = json.loads(previous_path.read_text())["scenarios"]
+    print(f"\nChange vs {previous_path}:")
+    for name, result in current.items():
+        before = previous.get(name)
+        if not before:
+            continue
+        deltas = []
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            if before[metric]:
+                deltas.append(f"{metric} {(result[metric] - before[metric]) / before[metric] * 100:+.1f}%")
+        print(f"  {name:<9} " + "  ".join(deltas))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+async def run(args):
+    random.seed(args.seed)
+    upstream_port = free_port()
+    incident = {"active": False, "latency": args.incident_latency}
+    runner = web.AppRunner(fake_coingecko(args.upstream_latency, args.upstream_error_rate, incident), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", upstream_port).start()
+
+    install_llm_stub(args.llm_latency, args.llm_sigma, args.llm_error_rate, args.llm_bad_json_rate)
+    db_name = f"juno_load_{uuid.uuid4().hex[:8]}"
+    os.environ.update({
+        "MONGO_URL": args.mongo_url or "mongodb://127.0.0.1:27017",
+        "DB_NAME": db_name,
+        "COINGECKO_BASE_URL": f"http://127.0.0.1:{upstream_port}",
+        "EMERGENT_LLM_KEY": "stub",
+        "PRECOMPUTE_ENABLED": "true" if args.precompute else "false",
+        "CANDLE_BACKFILL_EVERY": "0",
+    })
+    for item in args.env:
+        key, _, value = item.partition("=")
+        os.environ[key] = value
+
+    import uvicorn
+    import server
+
+    if not args.mongo_url:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("mongomock-motor is not installed; pass --mongo-url to use a local MongoDB")
+        server.client = AsyncMongoMockClient()
+        server.db = server.client[db_name]
+
+    port = free_port()
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+    api = uvicorn.Server(config)
+    api.install_signal_handlers = lambda: None
+    serving = asyncio.create_task(api.serve())
+    while not api.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.05)
+    base_url = f"http://127.0.0.1:{port}"
+
+    with open(BACKEND_DIR / "data" / "coin_list.json") as f:
+        assets = [coin["symbol"].upper() for coin in json.load(f)[:args.assets]]
+    sessions = [str(uuid.uuid4()) for _ in range(args.sessions)]
+    factories = request_factories(assets, sessions, min(args.batch_size, len(assets)))
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+
+    results = {}
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            # Give every history session a few messages before anything is measured
+            seed = [("POST", "/api/chat", {"json": {"message": f"Thoughts on {random.choice(assets)}?",
+                                                     "session_id": sid}}) for sid in sessions for _ in range(3)]
+            seeded = iter(seed)
+            await drive(session, base_url, lambda: next(seeded), len(seed), args.concurrency)
+            if args.incident:
+                # Quote every asset once while upstream is healthy, then take it down
+                for i in range(0, len(assets), 100):
+                    async with session.get(base_url + "/api/market",
+                                           params={"assets": ",".join(assets[i:i + 100])}) as response:
+                        await response.read()
+                incident["active"] = True
+            for name in scenarios:
+                if args.warmup:
+                    await drive(session, base_url, factories[name], args.warmup, args.concurrency)
+                results[name] = await drive(session, base_url, factories[name], args.requests, args.concurrency)
+                r = results[name]
+                print(f"{name:<9} {r['requests']:>6} req  {r['throughput_rps']:>8.1f} rps  "
+                      f"p50 {r['p50_ms']:>8.1f}  p95 {r['p95_ms']:>8.1f}  p99 {r['p99_ms']:>8.1f} ms  "
+                      f"errors {r['errors']}")
+            async with session.get(base_url + "/api/stats") as response:
+                server_stats = await response.json()
+    finally:
+        api.should_exit = True
+        await serving
+        await runner.cleanup()
+        if args.mongo_url:
+            await server.client.drop_database(db_name)
+
+    output = Path(args.output) if args.output else (
+        BACKEND_DIR / "benchmarks" / "results" / f"load-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "config": vars(args),
+        "scenarios": results,
+        "server_stats": server_stats,
+    }, indent=2, default=str))
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(results, Path(args.compare))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="market,research,chat,history",
+                        help=f"comma-separated, from {','.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=60.0, help="client timeout per request")
+    parser.add_argument("--assets", type=int, default=20, help="draw assets from the top N of the coin list")
+    parser.add_argument("--sessions", type=int, default=20, help="chat sessions used by chat and history")
+    parser.add_argument("--batch-size", type=int, default=10, help="assets per batch research request")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="fake CoinGecko latency (s)")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--incident", action="store_true",
+                        help="upstream hangs for every measured request (after one healthy quote per asset)")
+    parser.add_argument("--incident-latency", type=float, default=30.0, help="upstream hang during --incident (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="median stub LLM latency (s)")
+    parser.add_argument("--llm-sigma", type=float, default=0.4, help="log-normal spread of LLM latency")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-bad-json-rate", type=float, default=0.0)
+    parser.add_argument("--mongo-url", help="local MongoDB to use instead of mongomock-motor")
+    parser.add_argument("--precompute", action="store_true", help="keep the precompute scheduler running")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra server configuration, may be repeated")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="results file (default benchmarks/results/load-<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+    unknown = set(s.strip() for s in args.scenarios.split(",") if s.strip()) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
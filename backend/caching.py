@@ -0,0 +1,164 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a fixed TTL"""
+
+    _MISSING = object()
+
+    def __init__(self, ttl: float, max_size: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, self._MISSING)
+        if entry is self._MISSING:
+            self.misses += 1
+            return default
+        value, expires_at = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._data[key] = (value, self._clock() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class _Flight:
+    """One shared call and the number of callers still waiting on it"""
+
+    __slots__ = ("task", "keys", "batched", "waiters")
+
+    def __init__(self, task: "asyncio.Task", keys: List[Hashable], batched: bool):
+        self.task = task
+        self.keys = keys
+        # do_many flights resolve to a dict keyed by keys, do flights to the value itself
+        self.batched = batched
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one in-flight task.
+
+    The call runs in its own task and every caller, the first one included,
+    awaits it through asyncio.shield: a caller that is cancelled or times out
+    only stops waiting. The task is cancelled once its last waiter has left.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self.coalesced = 0
+
+    def _start(self, keys: List[Hashable], awaitable: Awaitable[Any], batched: bool = False) -> _Flight:
+        flight = _Flight(asyncio.ensure_future(awaitable), keys, batched)
+        for key in keys:
+            self._inflight[key] = flight
+        flight.task.add_done_callback(lambda task: self._finished(flight))
+        return flight
+
+    def _release(self, flight: _Flight):
+        for key in flight.keys:
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+
+    def _finished(self, flight: _Flight):
+        self._release(flight)
+        if not flight.task.cancelled():
+            # retrieve it so a task nobody awaits any more does not log "exception was never retrieved"
+            flight.task.exception()
+
+    async def _wait(self, flights: List[_Flight]) -> List[Any]:
+        for flight in flights:
+            flight.waiters += 1
+        try:
+            return [await asyncio.shield(flight.task) for flight in flights]
+        finally:
+            for flight in flights:
+                flight.waiters -= 1
+                if flight.waiters == 0 and not flight.task.done():
+                    # Nobody wants the result any more; later callers start a fresh call
+                    self._release(flight)
+                    flight.task.cancel()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+        else:
+            flight = self._start([key], fn())
+        (result,) = await self._wait([flight])
+        return result
+
+    async def do_many(
+        self,
+        keys: Iterable[Hashable],
+        fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+    ) -> Dict[Hashable, Any]:
+        """Resolve several keys with one call to fn for the keys nobody is fetching yet.
+
+        fn receives the keys this caller leads and returns a dict keyed by them;
+        keys missing from that dict resolve to None.
+        """
+        keys = list(dict.fromkeys(keys))
+        flights: Dict[Hashable, _Flight] = {}
+        for key in keys:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                flights[key] = flight
+        leading = [key for key in keys if key not in flights]
+        if leading:
+            flight = self._start(leading, fn(leading), batched=True)
+            for key in leading:
+                flights[key] = flight
+
+        unique = list({id(flight): flight for flight in flights.values()}.values())
+        values = dict(zip(map(id, unique), await self._wait(unique)))
+        return {
+            key: values[id(flight)].get(key) if flight.batched else values[id(flight)]
+            for key, flight in flights.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"inflight": len(self._inflight), "coalesced": self.coalesced}
@@ -0,0 +1,268 @@
+"""Local OHLCV candle store.
+
+Candles are persisted in a Mongo time-series collection (one document per
+candle, metaField {asset, interval}) and mirrored in memory as contiguous
+per-column NumPy buffers, so range reads are slices of those buffers rather
+than copies. Backfill only asks the upstream for candles newer than the
+last stored one. Only assets accepted by `known` are loaded or backfilled,
+and at most max_series series are kept in memory (least recently used first
+out; an evicted series is hydrated from Mongo again when next read).
+"""
+import asyncio
+import logging
+import random
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# interval -> (candle length in seconds, CoinGecko /ohlc `days` value that yields it)
+INTERVALS: Dict[str, Tuple[int, int]] = {
+    "30m": (1800, 1),
+    "4h": (14400, 30),
+    "4d": (345600, 365),
+}
+
+COLUMNS = ("t", "open", "high", "low", "close", "volume")
+
+
+class CandleSeries:
+    """Append-only columnar buffer for one (asset, interval), timestamps in epoch ms"""
+
+    def __init__(self, capacity: int = 256):
+        self._columns = {
+            name: np.empty(capacity, dtype=np.int64 if name == "t" else np.float64)
+            for name in COLUMNS
+        }
+        self.size = 0
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self._columns["t"][self.size - 1]) if self.size else None
+
+    def append(self, rows: np.ndarray):
+        """Append rows of (t, open, high, low, close, volume) that are newer than the last candle"""
+        if rows.shape[0] == 0:
+            return
+        needed = self.size + rows.shape[0]
+        capacity = self._columns["t"].shape[0]
+        if needed > capacity:
+            # Grow geometrically so repeated small backfills stay amortized O(1)
+            capacity = max(needed, capacity * 2)
+            for name, column in self._columns.items():
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:self.size] = column[:self.size]
+                self._columns[name] = grown
+        for i, name in enumerate(COLUMNS):
+            self._columns[name][self.size:needed] = rows[:, i]
+        self.size = needed
+
+    def range(self, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Columns for start <= t <= end as views into the buffer (no copy)"""
+        t = self._columns["t"][:self.size]
+        lo = 0 if start is None else int(np.searchsorted(t, start, side="left"))
+        hi = self.size if end is None else int(np.searchsorted(t, end, side="right"))
+        return {name: column[lo:hi] for name, column in self._columns.items()}
+
+
+class CandleStore:
+    def __init__(
+        self,
+        database: Callable[[], Any],
+        fetch_ohlc: Callable[[str, int], Awaitable[List[List[float]]]],
+        collection_name: str = "candles",
+        known: Optional[Callable[[str], bool]] = None,
+        max_series: int = 512,
+    ):
+        self._database = database
+        self._fetch_ohlc = fetch_ohlc
+        self.collection_name = collection_name
+        self._known = known
+        self.max_series = max_series
+        self._series: "OrderedDict[Tuple[str, str], CandleSeries]" = OrderedDict()
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self.evictions = 0
+        self.unknown_lookups = 0
+        self._job: Optional[asyncio.Task] = None
+        self.backfill_runs = 0
+        self.candles_inserted = 0
+        self.last_backfill: Dict[str, str] = {}
+
+    @property
+    def collection(self):
+        return self._database()[self.collection_name]
+
+    async def ensure_collection(self):
+        """Create the time-series collection and its (asset, interval, t) index"""
+        db = self._database()
+        try:
+            if self.collection_name not in await db.list_collection_names():
+                await db.create_collection(
+                    self.collection_name,
+                    timeseries={"timeField": "t", "metaField": "meta", "granularity": "minutes"}
+                )
+        except Exception as e:
+            # Servers without time-series support fall back to a regular collection
+            logging.warning(f"Candle time-series collection unavailable, using a regular collection: {e}")
+        try:
+            await self.collection.create_index([("meta.asset", 1), ("meta.interval", 1), ("t", 1)])
+        except Exception as e:
+            logging.error(f"Candle index creation failed: {e}")
+
+    def _lock(self, key: Tuple[str, str]) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    def is_known(self, asset: str) -> bool:
+        if self._known is None or self._known(asset):
+            return True
+        self.unknown_lookups += 1
+        return False
+
+    def _remember(self, key: Tuple[str, str], series: CandleSeries):
+        self._series[key] = series
+        while len(self._series) > self.max_series:
+            evicted, _ = self._series.popitem(last=False)
+            self.evictions += 1
+            lock = self._locks.get(evicted)
+            if lock is not None and not lock.locked():
+                del self._locks[evicted]
+
+    async def _load(self, key: Tuple[str, str]) -> CandleSeries:
+        """Series for key, hydrated from Mongo the first time it is touched"""
+        series = self._series.get(key)
+        if series is not None:
+            self._series.move_to_end(key)
+            return series
+        asset, interval = key
+        if not self.is_known(asset):
+            # Not tracked: an empty series that is neither stored nor read from Mongo
+            return CandleSeries(capacity=0)
+        series = CandleSeries()
+        try:
+            docs = await self.collection.find(
+                {"meta.asset": asset, "meta.interval": interval},
+                {"_id": 0, "t": 1, "o": 1, "h": 1, "l": 1, "c": 1, "v": 1}
+            ).sort("t", 1).to_list(None)
+        except Exception as e:
+            logging.error(f"Candle load failed for {asset}/{interval}: {e}")
+            docs = []
+        if key in self._series:
+            # Another caller hydrated it while we were waiting on Mongo
+            self._series.move_to_end(key)
+            return self._series[key]
+        if docs:
+            series.append(np.array([
+                (_to_ms(d["t"]), d["o"], d["h"], d["l"], d["c"], np.nan if d.get("v") is None else d["v"])
+                for d in docs
+            ], dtype=np.float64))
+        self._remember(key, series)
+        return series
+
+    async def backfill(self, asset: str, interval: str = "4h") -> int:
+        """Fetch and store candles newer than the last stored one; returns how many were added"""
+        if interval not in INTERVALS:
+            raise ValueError(f"Unsupported interval {interval}")
+        key = (asset.upper(), interval)
+        if not self.is_known(key[0]):
+            return 0
+        try:
+            return await self._backfill(key)
+        finally:
+            lock = self._locks.get(key)
+            if key not in self._series and lock is not None and not lock.locked():
+                # Evicted while backfilling; do not keep its lock around
+                del self._locks[key]
+
+    async def _backfill(self, key: Tuple[str, str]) -> int:
+        interval = key[1]
+        async with self._lock(key):
+            series = await self._load(key)
+            last = series.last_timestamp
+            rows = await self._fetch_ohlc(key[0], INTERVALS[interval][1])
+            fresh = [row[:5] for row in rows if last is None or row[0] > last]
+            if not fresh:
+                return 0
+
+            # CoinGecko /ohlc carries no volume; store NaN rather than a fake zero
+            block = np.array([(*row, np.nan) for row in fresh], dtype=np.float64)
+            docs = [
+                {
+                    "t": datetime.fromtimestamp(row[0] / 1000, tz=timezone.utc),
+                    "meta": {"asset": key[0], "interval": interval},
+                    "o": row[1], "h": row[2], "l": row[3], "c": row[4], "v": None,
+                }
+                for row in fresh
+            ]
+            try:
+                await self.collection.insert_many(docs, ordered=False)
+            except Exception as e:
+                logging.error(f"Candle insert failed for {key[0]}/{interval}: {e}")
+            series.append(block)
+            self.candles_inserted += len(fresh)
+            self.last_backfill[f"{key[0]}/{interval}"] = datetime.now(timezone.utc).isoformat()
+            return len(fresh)
+
+    async def ensure_fresh(self, asset: str, interval: str = "4h") -> int:
+        """Backfill only when the newest stored candle is more than one interval old"""
+        if not self.is_known(asset.upper()):
+            return 0
+        series = await self._load((asset.upper(), interval))
+        last = series.last_timestamp
+        now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+        if last is not None and now_ms - last < INTERVALS[interval][0] * 1000:
+            return 0
+        return await self.backfill(asset, interval)
+
+    async def read_range(self, asset: str, interval: str = "4h", start: Optional[int] = None,
+                         end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Contiguous column arrays (t, open, high, low, close, volume) for start <= t <= end in epoch ms"""
+        series = await self._load((asset.upper(), interval))
+        return series.range(start, end)
+
+    def start_backfill(self, assets: Iterable[str], intervals: Iterable[str], every: float):
+        """Run incremental backfill for the given assets periodically until stop() is called"""
+        if self._job is None or self._job.done():
+            self._job = asyncio.create_task(self._backfill_loop(list(assets), list(intervals), every))
+
+    async def _backfill_loop(self, assets: List[str], intervals: List[str], every: float):
+        while True:
+            for asset in assets:
+                for interval in intervals:
+                    try:
+                        await self.backfill(asset, interval)
+                    except Exception as e:
+                        logging.error(f"Candle backfill failed for {asset}/{interval}: {e}")
+            self.backfill_runs += 1
+            # Jitter keeps several workers from hitting the upstream in lockstep
+            await asyncio.sleep(every * random.uniform(0.9, 1.1))
+
+    async def stop(self):
+        if self._job is not None:
+            self._job.cancel()
+            try:
+                await self._job
+            except asyncio.CancelledError:
+                pass
+            self._job = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "series": {f"{a}/{i}": s.size for (a, i), s in self._series.items()},
+            "max_series": self.max_series,
+            "evictions": self.evictions,
+            "unknown_lookups": self.unknown_lookups,
+            "backfill_runs": self.backfill_runs,
+            "candles_inserted": self.candles_inserted,
+            "last_backfill": self.last_backfill,
+        }
+
+
+def _to_ms(value: Any) -> int:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    return int(value)
@@ -0,0 +1,136 @@
+"""Circuit breaker for upstream calls.
+
+closed: calls go through; failure_threshold consecutive failures (errors or
+calls exceeding call_timeout) open the circuit. open: calls are rejected
+immediately with CircuitOpenError. After reset_timeout the circuit is
+half-open and lets up to half_open_max_calls probe calls through; a probe
+success closes it, a probe failure opens it again for another reset_timeout.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from metrics import Counter, Gauge
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+circuit_state = Gauge("juno_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ["name"])
+circuit_transitions = Counter("juno_circuit_transitions_total", "Circuit breaker state changes", ["name", "state"])
+circuit_rejected = Counter("juno_circuit_rejected_total", "Calls rejected by an open circuit", ["name"])
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker around async calls to one upstream"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        call_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.call_timeout = call_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+        circuit_state.labels(name).set_function(lambda: STATE_VALUES[self.state])
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit admits a probe"""
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def _transition(self, state: str):
+        self._state = state
+        circuit_transitions.labels(self.name, state).inc()
+
+    def _allow(self) -> bool:
+        if self._state == OPEN:
+            if self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self._transition(HALF_OPEN)
+            self._probes = 0
+        if self._state == HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                return False
+            self._probes += 1
+        return True
+
+    def _open(self):
+        self._opened_at = self._clock()
+        self.opened += 1
+        self._transition(OPEN)
+
+    def _on_success(self):
+        self._consecutive_failures = 0
+        if self._state == HALF_OPEN:
+            self._transition(CLOSED)
+
+    def _on_failure(self):
+        self.failures += 1
+        self._consecutive_failures += 1
+        if self._state == OPEN:
+            # A call started before the circuit opened; it does not extend the open period
+            return
+        if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self._allow():
+            self.rejected += 1
+            circuit_rejected.labels(self.name).inc()
+            raise CircuitOpenError(f"{self.name} circuit is open; retry in {self.retry_after():.1f}s")
+        probe = self._state == HALF_OPEN
+        try:
+            if self.call_timeout:
+                try:
+                    result = await asyncio.wait_for(fn(), timeout=self.call_timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"{self.name} call exceeded {self.call_timeout:g}s") from None
+            else:
+                result = await fn()
+        except asyncio.CancelledError:
+            if probe and self._state == HALF_OPEN:
+                # The probe never finished; let another call try
+                self._probes -= 1
+            raise
+        except Exception:
+            self._on_failure()
+            raise
+        self._on_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "opened": self.opened,
+            "retry_after_seconds": round(self.retry_after(), 2),
+        }
@@ -0,0 +1,132 @@
+"""Response compression for large JSON payloads.
+
+Bodies at or above minimum_size are compressed with brotli when the client
+accepts it, otherwise gzip. `brotli` is in requirements.txt; the import is
+guarded so an install without it still serves gzip.
+Only single-chunk responses are compressed: streamed bodies (Server-Sent
+Events, chunked downloads) pass through untouched so events are not held
+back in a compressor buffer. Bodies of thread_min_size bytes or more are
+compressed in a worker thread (zlib and brotli release the GIL) so a large
+history page does not stall the event loop.
+"""
+import asyncio
+import gzip
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # gzip only without it
+    brotli = None
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}"""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    return accepted
+
+
+class CompressionStats:
+    """Counters shared with the middleware instance Starlette builds"""
+
+    def __init__(self):
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.by_encoding: Dict[str, int] = {}
+
+    def record(self, encoding: str, size_in: int, size_out: int):
+        self.compressed += 1
+        self.bytes_in += size_in
+        self.bytes_out += size_out
+        self.by_encoding[encoding] = self.by_encoding.get(encoding, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "brotli_available": brotli is not None,
+            "compressed": self.compressed,
+            "by_encoding": dict(self.by_encoding),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+        }
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete response bodies of at least minimum_size bytes"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 thread_min_size: int = 65536, stats: Optional[CompressionStats] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_min_size = thread_min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = stats or CompressionStats()
+
+    def choose(self, accept_encoding: str) -> Optional[str]:
+        accepted = accepted_encodings(accept_encoding)
+        if brotli is not None and accepted.get("br", 0) > 0:
+            return "br"
+        if accepted.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        held: Dict[str, Any] = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk shows whether the body is complete
+                held["start"] = message
+                return
+            start = held.pop("start", None)
+            if start is None or message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                await send(message)
+                return
+            body = message.get("body", b"")
+            # Copied: the header list may belong to a response object that is reused
+            headers = MutableHeaders(raw=list(start["headers"]))
+            if (message.get("more_body") or len(body) < self.minimum_size or "content-encoding" in headers
+                    or headers.get("content-type", "").startswith("text/event-stream")):
+                await send(start)
+                await send(message)
+                return
+            if len(body) >= self.thread_min_size:
+                compressed = await asyncio.to_thread(self.compress, body, encoding)
+            else:
+                compressed = self.compress(body, encoding)
+            self.stats.record(encoding, len(body), len(compressed))
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
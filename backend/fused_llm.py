@@ -0,0 +1,103 @@
+"""One LLM round trip for several research agents.
+
+A fused call sends a single prompt containing every participating agent's
+role, inputs and answer schema, and asks for one JSON object with a section
+per agent. Each section is validated against its agent's schema; agents whose
+section is missing or malformed fall back to their own call. The running
+fused call reaches the agents through the `fused_call` context variable.
+"""
+import asyncio
+import json
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from metrics import Counter
+
+FUSED_SYSTEM_MESSAGE = """You are a crypto research desk answering for several specialist analysts at once.
+            Answer each section in that analyst's role, using only that section's inputs.
+            Respond with a single JSON object and nothing else."""
+
+fused_calls = Counter(
+    "juno_fused_llm_calls_total", "Fused multi-agent LLM calls by validation outcome", ["outcome"]
+)
+
+
+@dataclass(frozen=True)
+class FusedSection:
+    name: str
+    role: str
+    prompt: str
+    schema: Dict[str, Any]
+
+
+def describe(schema: Any) -> Any:
+    """Schema as shown to the model: {"score": "number", "highlights": ["string"], ...}"""
+    if isinstance(schema, dict):
+        return {key: describe(value) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [describe(schema[0])]
+    return {float: "number", int: "integer", str: "string", bool: "boolean"}.get(schema, "any")
+
+
+def conforms(value: Any, schema: Any) -> bool:
+    """Whether value matches a schema of nested dicts, one-element lists and Python types"""
+    if isinstance(schema, dict):
+        return isinstance(value, dict) and all(key in value and conforms(value[key], sub) for key, sub in schema.items())
+    if isinstance(schema, list):
+        return isinstance(value, list) and all(conforms(item, schema[0]) for item in value)
+    if schema is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, schema)
+
+
+def build_prompt(asset: str, sections: List[FusedSection]) -> str:
+    parts = [f"Research {asset}. Answer every section below."]
+    for section in sections:
+        # Agent prompts are indented triple-quoted strings; the indentation is only paid-for tokens here
+        role = " ".join(section.role.split())
+        inputs = "\n".join(line.strip() for line in section.prompt.splitlines() if line.strip())
+        parts.append(f"## {section.name}\nRole: {role}\nInputs:\n{inputs}")
+    schema = {section.name: describe(section.schema) for section in sections}
+    parts.append(
+        "Respond with one JSON object.\n"
+        f"Top-level keys: {', '.join(section.name for section in sections)}\n"
+        f"Schema: {json.dumps(schema, separators=(',', ':'))}"
+    )
+    return "\n\n".join(parts)
+
+
+def split_sections(result: Optional[Dict[str, Any]], sections: List[FusedSection]) -> Dict[str, Dict[str, Any]]:
+    """Sections of a parsed fused reply that match their schema, keyed by section name"""
+    if not isinstance(result, dict):
+        fused_calls.labels("invalid").inc()
+        return {}
+    valid = {s.name: result[s.name] for s in sections if s.name in result and conforms(result[s.name], s.schema)}
+    outcome = "ok" if len(valid) == len(sections) else "partial" if valid else "invalid"
+    fused_calls.labels(outcome).inc()
+    return valid
+
+
+class FusedCall:
+    """Handle on a running fused call shared by the agents that take part in it.
+
+    The task resolves to the validated sections; it reports its own failures
+    as an empty result rather than raising.
+    """
+
+    def __init__(self, names: List[str], task: "asyncio.Task[Dict[str, Dict[str, Any]]]"):
+        self.names = names
+        self.task = task
+
+    async def section(self, name: str) -> Optional[Dict[str, Any]]:
+        """The validated section for name, or None when the agent should make its own call"""
+        # Shielded: one agent timing out must not cancel the call for the others
+        sections = await asyncio.shield(self.task)
+        return sections.get(name)
+
+    def cancel(self):
+        if not self.task.done():
+            self.task.cancel()
+
+
+fused_call: ContextVar[Optional[FusedCall]] = ContextVar("fused_call", default=None)
@@ -0,0 +1,327 @@
+"""Vectorized technical indicators over OHLCV arrays.
+
+IndicatorEngine.compute runs every indicator over a full history with NumPy
+array operations; IndicatorEngine.update folds one new candle into the
+state returned by compute in O(1) (plus a bounded window for Bollinger
+bands and pivot levels), so callers never recompute the full history.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Largest growth factor allowed inside one EMA block before rescaling
+_EMA_BLOCK_RANGE = 1e100
+_EMA_MAX_BLOCK = 16384
+
+
+def ema(values: np.ndarray, period: Optional[int] = None, alpha: Optional[float] = None,
+        initial: Optional[float] = None) -> np.ndarray:
+    """Exponential moving average, y[t] = (1 - alpha) * y[t-1] + alpha * x[t].
+
+    Seeded with `initial` when given, otherwise with the first value
+    (pandas ewm(adjust=False) semantics). The recursion is solved in closed
+    form per block: within a block y[k] = d^(k+1) * (y_prev + alpha * cumsum(x * d^-(j+1))),
+    with the block length bounded so d^-B stays within float range.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = x.shape[0]
+    if alpha is None:
+        alpha = 2.0 / (period + 1)
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+    if alpha >= 1.0:
+        out[:] = x
+        return out
+
+    decay = 1.0 - alpha
+    block = int(min(_EMA_MAX_BLOCK, max(1, math.log(_EMA_BLOCK_RANGE) / -math.log(decay))))
+    powers = decay ** np.arange(1, block + 1, dtype=np.float64)
+    inv_powers = 1.0 / powers
+
+    if initial is None:
+        prev = x[0]
+        out[0] = x[0]
+        start = 1
+    else:
+        prev = float(initial)
+        start = 0
+    for lo in range(start, n, block):
+        hi = min(lo + block, n)
+        m = hi - lo
+        acc = np.cumsum(x[lo:hi] * inv_powers[:m])
+        acc *= alpha
+        acc += prev
+        acc *= powers[:m]
+        out[lo:hi] = acc
+        prev = acc[-1]
+    return out
+
+
+def rsi(close: np.ndarray, period: int = 14) -> Tuple[np.ndarray, float, float]:
+    """Wilder RSI; returns (rsi, last average gain, last average loss)"""
+    delta = np.diff(close, prepend=close[:1])
+    gains = np.clip(delta, 0.0, None)
+    losses = np.clip(-delta, 0.0, None)
+    avg_gain = ema(gains, alpha=1.0 / period)
+    avg_loss = ema(losses, alpha=1.0 / period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    values = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), values)
+    return values, float(avg_gain[-1]), float(avg_loss[-1])
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = np.concatenate((close[:1], close[:-1]))
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def bollinger(close: np.ndarray, period: int = 20, num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger bands (middle, upper, lower); the first period-1 values are NaN"""
+    n = close.shape[0]
+    middle = np.full(n, np.nan)
+    upper = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    if n >= period:
+        windows = sliding_window_view(close, period)
+        mean = windows.mean(axis=1)
+        std = windows.std(axis=1)
+        middle[period - 1:] = mean
+        upper[period - 1:] = mean + num_std * std
+        lower[period - 1:] = mean - num_std * std
+    return middle, upper, lower
+
+
+def pivot_points(high: np.ndarray, low: np.ndarray, window: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+    """Prices of swing highs and swing lows: extremes of a centred 2*window+1 candle window"""
+    span = 2 * window + 1
+    if high.shape[0] < span:
+        return np.empty(0), np.empty(0)
+    inner_high = high[window:-window]
+    inner_low = low[window:-window]
+    pivot_highs = inner_high[sliding_window_view(high, span).max(axis=1) == inner_high]
+    pivot_lows = inner_low[sliding_window_view(low, span).min(axis=1) == inner_low]
+    return pivot_highs, pivot_lows
+
+
+def cluster_levels(prices: np.ndarray, tolerance: float = 0.005) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge pivot prices within `tolerance` (relative) of each other; returns (level, touches)"""
+    if prices.shape[0] == 0:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    ordered = np.sort(prices)
+    breaks = np.flatnonzero(np.diff(ordered) > ordered[:-1] * tolerance) + 1
+    starts = np.concatenate(([0], breaks))
+    touches = np.diff(np.concatenate((starts, [ordered.shape[0]])))
+    levels = np.add.reduceat(ordered, starts) / touches
+    return levels, touches
+
+
+def support_resistance(high: np.ndarray, low: np.ndarray, price: float, window: int = 5,
+                       tolerance: float = 0.005, max_levels: int = 3) -> Dict[str, List[float]]:
+    """Nearest clustered pivot levels below (support) and above (resistance) the price"""
+    pivot_highs, pivot_lows = pivot_points(high, low, window)
+    levels, touches = cluster_levels(np.concatenate((pivot_highs, pivot_lows)), tolerance)
+    below = levels < price
+    support = levels[below][::-1][:max_levels]
+    resistance = levels[~below][:max_levels]
+    return {
+        "support": [round(float(v), 8) for v in sorted(support)],
+        "resistance": [round(float(v), 8) for v in resistance],
+    }
+
+
+@dataclass
+class IndicatorConfig:
+    rsi_period: int = 14
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    ema_periods: Tuple[int, ...] = (20, 50, 200)
+    atr_period: int = 14
+    bb_period: int = 20
+    bb_std: float = 2.0
+    pivot_window: int = 5
+    level_tolerance: float = 0.005
+    level_lookback: int = 500
+    max_levels: int = 3
+
+
+@dataclass
+class IndicatorState:
+    """Everything needed to fold the next candle in without the full history"""
+    count: int
+    last_timestamp: Optional[float]
+    close: float
+    emas: Dict[int, float]
+    macd_signal: float
+    avg_gain: float
+    avg_loss: float
+    atr: float
+    # Bounded trailing windows for Bollinger bands and pivot levels
+    recent_high: np.ndarray = field(repr=False)
+    recent_low: np.ndarray = field(repr=False)
+    recent_close: np.ndarray = field(repr=False)
+
+
+@dataclass
+class IndicatorSnapshot:
+    """Latest indicator values for the most recent candle"""
+    price: float
+    rsi: float
+    macd: float
+    macd_signal: float
+    macd_histogram: float
+    emas: Dict[int, float]
+    atr: float
+    bb_middle: float
+    bb_upper: float
+    bb_lower: float
+    levels: Dict[str, List[float]]
+    candles: int
+
+
+@dataclass
+class IndicatorSeries:
+    """Full indicator arrays aligned with the input candles"""
+    rsi: np.ndarray
+    macd: np.ndarray
+    macd_signal: np.ndarray
+    emas: Dict[int, np.ndarray]
+    atr: np.ndarray
+    bb_middle: np.ndarray
+    bb_upper: np.ndarray
+    bb_lower: np.ndarray
+
+
+class IndicatorEngine:
+    def __init__(self, config: Optional[IndicatorConfig] = None):
+        self.config = config or IndicatorConfig()
+
+    def _ema_periods(self) -> Tuple[int, ...]:
+        c = self.config
+        return tuple(sorted(set(c.ema_periods) | {c.macd_fast, c.macd_slow}))
+
+    def compute(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                timestamps: Optional[np.ndarray] = None) -> Tuple[IndicatorSeries, IndicatorState]:
+        """Compute every indicator over the full history in one vectorized pass"""
+        c = self.config
+        high = np.ascontiguousarray(high, dtype=np.float64)
+        low = np.ascontiguousarray(low, dtype=np.float64)
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        if close.shape[0] == 0:
+            raise ValueError("at least one candle is required")
+
+        emas = {p: ema(close, p) for p in self._ema_periods()}
+        macd_line = emas[c.macd_fast] - emas[c.macd_slow]
+        signal = ema(macd_line, c.macd_signal)
+        rsi_values, avg_gain, avg_loss = rsi(close, c.rsi_period)
+        atr_values = ema(true_range(high, low, close), alpha=1.0 / c.atr_period)
+        bb_middle, bb_upper, bb_lower = bollinger(close, c.bb_period, c.bb_std)
+
+        series = IndicatorSeries(
+            rsi=rsi_values,
+            macd=macd_line,
+            macd_signal=signal,
+            emas=emas,
+            atr=atr_values,
+            bb_middle=bb_middle,
+            bb_upper=bb_upper,
+            bb_lower=bb_lower,
+        )
+        keep = max(c.level_lookback, c.bb_period)
+        state = IndicatorState(
+            count=int(close.shape[0]),
+            last_timestamp=float(timestamps[-1]) if timestamps is not None and len(timestamps) else None,
+            close=float(close[-1]),
+            emas={p: float(v[-1]) for p, v in emas.items()},
+            macd_signal=float(signal[-1]),
+            avg_gain=avg_gain,
+            avg_loss=avg_loss,
+            atr=float(atr_values[-1]),
+            recent_high=high[-keep:].copy(),
+            recent_low=low[-keep:].copy(),
+            recent_close=close[-keep:].copy(),
+        )
+        return series, state
+
+    def update(self, state: IndicatorState, high: float, low: float, close: float,
+               timestamp: Optional[float] = None) -> IndicatorState:
+        """Fold one new candle into the state without touching the full history"""
+        c = self.config
+        high, low, close = float(high), float(low), float(close)
+        emas = {}
+        for period, value in state.emas.items():
+            alpha = 2.0 / (period + 1)
+            emas[period] = value + alpha * (close - value)
+        macd_line = emas[c.macd_fast] - emas[c.macd_slow]
+        macd_signal = state.macd_signal + 2.0 / (c.macd_signal + 1) * (macd_line - state.macd_signal)
+
+        delta = close - state.close
+        avg_gain = state.avg_gain + (max(delta, 0.0) - state.avg_gain) / c.rsi_period
+        avg_loss = state.avg_loss + (max(-delta, 0.0) - state.avg_loss) / c.rsi_period
+        tr = max(high - low, abs(high - state.close), abs(low - state.close))
+        atr = state.atr + (tr - state.atr) / c.atr_period
+
+        keep = max(c.level_lookback, c.bb_period)
+        if state.recent_close.shape[0] >= keep:
+            recent_high = np.roll(state.recent_high, -1)
+            recent_low = np.roll(state.recent_low, -1)
+            recent_close = np.roll(state.recent_close, -1)
+            recent_high[-1], recent_low[-1], recent_close[-1] = high, low, close
+        else:
+            recent_high = np.append(state.recent_high, high)
+            recent_low = np.append(state.recent_low, low)
+            recent_close = np.append(state.recent_close, close)
+
+        return IndicatorState(
+            count=state.count + 1,
+            last_timestamp=timestamp if timestamp is not None else state.last_timestamp,
+            close=float(close),
+            emas=emas,
+            macd_signal=macd_signal,
+            avg_gain=avg_gain,
+            avg_loss=avg_loss,
+            atr=atr,
+            recent_high=recent_high,
+            recent_low=recent_low,
+            recent_close=recent_close,
+        )
+
+    def snapshot(self, state: IndicatorState) -> IndicatorSnapshot:
+        """Latest indicator values derived from the state"""
+        c = self.config
+        if state.avg_loss == 0:
+            rsi_value = 50.0 if state.avg_gain == 0 else 100.0
+        else:
+            rsi_value = 100.0 - 100.0 / (1.0 + state.avg_gain / state.avg_loss)
+        macd_line = state.emas[c.macd_fast] - state.emas[c.macd_slow]
+
+        window = state.recent_close[-c.bb_period:]
+        if window.shape[0] >= c.bb_period:
+            bb_middle = float(window.mean())
+            spread = c.bb_std * float(window.std())
+        else:
+            bb_middle, spread = float("nan"), float("nan")
+
+        levels = support_resistance(
+            state.recent_high, state.recent_low, state.close,
+            c.pivot_window, c.level_tolerance, c.max_levels
+        )
+        return IndicatorSnapshot(
+            price=state.close,
+            rsi=float(rsi_value),
+            macd=float(macd_line),
+            macd_signal=float(state.macd_signal),
+            macd_histogram=float(macd_line - state.macd_signal),
+            emas={p: v for p, v in state.emas.items() if p in c.ema_periods},
+            atr=float(state.atr),
+            bb_middle=bb_middle,
+            bb_upper=bb_middle + spread,
+            bb_lower=bb_middle - spread,
+            levels=levels,
+            candles=state.count,
+        )
@@ -0,0 +1,147 @@
+"""Deferred construction of expensive clients and a report of where startup time goes.
+
+Nothing here connects or imports heavy SDKs at module import: the Mongo
+client, the LLM SDK and the research agents are built on first use (or in
+the startup hook when warm-up is enabled), and every step that does run is
+timed into a StartupReport.
+"""
+import contextlib
+import importlib
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+class StartupReport:
+    """Wall-clock cost of imports, lazy initializations and startup-hook steps, in milliseconds"""
+
+    def __init__(self):
+        self.created = time.perf_counter()
+        self.phases: Dict[str, Dict[str, float]] = {"import": {}, "init": {}, "startup": {}}
+        self.module_import_ms: Optional[float] = None
+        self.ready_at: Optional[str] = None
+        self.ready_ms: Optional[float] = None
+
+    @contextlib.contextmanager
+    def measure(self, phase: str, component: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            bucket = self.phases.setdefault(phase, {})
+            bucket[component] = round(bucket.get(component, 0.0) + elapsed, 3)
+
+    def time_imports(self, *modules: str):
+        """Import modules one by one so each one's first-import cost is recorded"""
+        for name in modules:
+            with self.measure("import", name):
+                importlib.import_module(name)
+
+    def module_imported(self):
+        self.module_import_ms = round((time.perf_counter() - self.created) * 1000, 3)
+
+    def ready(self):
+        self.ready_ms = round((time.perf_counter() - self.created) * 1000, 3)
+        self.ready_at = datetime.now(timezone.utc).isoformat()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "module_import_ms": self.module_import_ms,
+            "ready_ms": self.ready_ms,
+            "ready_at": self.ready_at,
+            **{phase: dict(sorted(steps.items(), key=lambda kv: -kv[1])) for phase, steps in self.phases.items()},
+        }
+
+
+class LazyMongoClient:
+    """Builds the Motor client from MONGO_URL the first time it is used.
+
+    A missing MONGO_URL only fails the operations that need Mongo, not the
+    import of the app.
+    """
+
+    def __init__(self, report: StartupReport, url_env: str = "MONGO_URL", **client_kwargs):
+        self._report = report
+        self._url_env = url_env
+        self._client_kwargs = client_kwargs
+        self._client = None
+
+    @property
+    def built(self) -> bool:
+        return self._client is not None
+
+    @property
+    def client(self):
+        if self._client is None:
+            url = os.environ.get(self._url_env)
+            if not url:
+                raise RuntimeError(f"{self._url_env} is not set")
+            with self._report.measure("init", "mongo_client"):
+                from motor.motor_asyncio import AsyncIOMotorClient
+                self._client = AsyncIOMotorClient(url, **self._client_kwargs)
+        return self._client
+
+    def __getitem__(self, name: str):
+        return self.client[name]
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+
+
+class LazyDatabase:
+    """Database handle resolved on first attribute access (db.chat_messages, db["x"])"""
+
+    def __init__(self, client: LazyMongoClient, name_env: str = "DB_NAME"):
+        self._client = client
+        self._name_env = name_env
+        self._db = None
+
+    def _resolve(self):
+        if self._db is None:
+            name = os.environ.get(self._name_env)
+            if not name:
+                raise RuntimeError(f"{self._name_env} is not set")
+            self._db = self._client[name]
+        return self._db
+
+    def __getitem__(self, name: str):
+        return self._resolve()[name]
+
+    def __getattr__(self, name: str):
+        return getattr(self._resolve(), name)
+
+
+class AgentRegistry:
+    """Builds agents from registered factories on first use and times each construction"""
+
+    def __init__(self, report: StartupReport):
+        self._report = report
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._agents: Dict[str, Any] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        agent = self._agents.get(name)
+        if agent is None:
+            with self._report.measure("init", f"agent:{name}"):
+                agent = self._agents[name] = self._factories[name]()
+        return agent
+
+    def get_many(self, names: Iterable[str]) -> List[Any]:
+        return [self.get(name) for name in names]
+
+    def warm(self, names: Optional[Iterable[str]] = None):
+        """Build agents ahead of the first request"""
+        for name in names or list(self._factories):
+            self.get(name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"registered": sorted(self._factories), "built": sorted(self._agents)}
@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from caching import TTLCache, SingleFlight
+
+
+def quantize_market_inputs(
+    market_data: Dict[str, Any],
+    price_step: float = 0.005,
+    change_step: float = 0.5,
+    volume_step: float = 0.1,
+) -> str:
+    """Bucket the market snapshot so small moves map to the same cache key.
+
+    Price and volume use log-scale buckets (relative steps, so 0.005 is 0.5%),
+    the 24h change is rounded to change_step percentage points.
+    """
+    def log_bucket(value: Any, step: float) -> int:
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return 0
+        if value <= 0:
+            return 0
+        return int(math.floor(math.log(value) / math.log1p(step)))
+
+    try:
+        change = float(market_data.get('usd_24h_change') or 0)
+    except (TypeError, ValueError):
+        change = 0.0
+    change_bucket = int(round(change / change_step)) if change_step > 0 else 0
+    return "p{}:c{}:v{}".format(
+        log_bucket(market_data.get('usd'), price_step),
+        change_bucket,
+        log_bucket(market_data.get('usd_24h_vol'), volume_step),
+    )
+
+
+class LLMResponseCache:
+    """Caches agent LLM responses keyed on (agent, asset, quantized market inputs).
+
+    Entries live in an in-process TTL/LRU cache and, when a collection is
+    provided, in a Mongo collection with a TTL index so they survive restarts.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        collection: Optional[Callable[[], Any]] = None,
+        price_step: float = 0.005,
+        change_step: float = 0.5,
+        volume_step: float = 0.1,
+    ):
+        self.memory = TTLCache(ttl=ttl, max_size=max_size)
+        self.flight = SingleFlight()
+        self._collection = collection
+        self.price_step = price_step
+        self.change_step = change_step
+        self.volume_step = volume_step
+        self.persistent_hits = 0
+        self.llm_calls = 0
+
+    def key(self, agent: str, asset: str, market_data: Dict[str, Any], prompt_version: str = "") -> str:
+        buckets = quantize_market_inputs(market_data, self.price_step, self.change_step, self.volume_step)
+        key = f"{agent}:{asset.upper()}:{buckets}"
+        if prompt_version:
+            # Changing an agent's system prompt invalidates its cached answers
+            key += ":" + hashlib.sha1(prompt_version.encode()).hexdigest()[:8]
+        return key
+
+    async def ensure_indexes(self):
+        if self._collection is None:
+            return
+        try:
+            await self._collection().create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            logging.error(f"LLM cache index creation failed: {e}")
+
+    async def get_or_call(self, key: str, call: Callable[[], Awaitable[str]]) -> str:
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached
+        return await self.flight.do(key, lambda: self._load_or_call(key, call))
+
+    async def _load_or_call(self, key: str, call: Callable[[], Awaitable[str]]) -> str:
+        if self._collection is not None:
+            try:
+                doc = await self._collection().find_one(
+                    {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+                    {"response": 1}
+                )
+            except Exception as e:
+                logging.error(f"LLM cache read failed: {e}")
+                doc = None
+            if doc is not None:
+                self.persistent_hits += 1
+                self.memory.set(key, doc["response"])
+                return doc["response"]
+
+        self.llm_calls += 1
+        response = await call()
+        if isinstance(response, str) and response:
+            self.memory.set(key, response)
+            await self._persist(key, response)
+        return response
+
+    async def _persist(self, key: str, response: str):
+        if self._collection is None:
+            return
+        try:
+            await self._collection().replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "response": response,
+                    "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.memory.ttl),
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logging.error(f"LLM cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.memory.stats(),
+            **self.flight.stats(),
+            "persistent": self._collection is not None,
+            "persistent_hits": self.persistent_hits,
+            "llm_calls": self.llm_calls,
+        }
@@ -0,0 +1,240 @@
+"""Shared dispatch layer for LLM calls.
+
+Every model call goes through one LLMDispatcher, which applies a token-bucket
+rate limit per (provider, model), a global concurrency limit and retries with
+jittered exponential backoff. Waiters are admitted by priority class, so
+interactive requests overtake background precompute work. The priority of a
+call comes from the `llm_priority` context variable of the task that makes it.
+"""
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import random
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from metrics import Counter, Histogram
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+llm_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+llm_call_seconds = Histogram(
+    "juno_llm_call_duration_seconds", "LLM call latency per attempt, excluding queue wait",
+    ["model", "outcome"]
+)
+llm_queue_wait_seconds = Histogram(
+    "juno_llm_queue_wait_seconds", "Time an LLM call waited for rate limit and concurrency",
+    ["model", "priority"]
+)
+llm_errors = Counter("juno_llm_errors_total", "Failed LLM call attempts", ["model"])
+
+
+@contextlib.contextmanager
+def priority(level: int) -> Iterator[None]:
+    """Run LLM calls made inside the block (and tasks it creates) at the given priority"""
+    token = llm_priority.set(level)
+    try:
+        yield
+    finally:
+        llm_priority.reset(token)
+
+
+class PrioritySemaphore:
+    """Semaphore that wakes waiters lowest priority value first, FIFO within a priority"""
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def waiting(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for level, _, fut in self._waiters:
+            if not fut.done():
+                name = PRIORITY_NAMES.get(level, str(level))
+                counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    async def acquire(self, level: int):
+        if self._value > 0 and not any(not fut.done() for _, _, fut in self._waiters):
+            self._value -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (level, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted a slot just as we were cancelled; hand it on
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._value += 1
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average with bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated: Optional[float] = None
+        self._turn = PrioritySemaphore(1)
+        self.throttled = 0
+
+    async def take(self, level: int):
+        # One taker at a time, in priority order, so a throttled model queues fairly
+        await self._turn.acquire(level)
+        try:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                self.throttled += 1
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+        finally:
+            self._turn.release()
+
+
+class ModelStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        attempts = self.calls + self.errors
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_queue_wait_ms": round(self.queue_wait_total / attempts * 1000, 2) if attempts else 0.0,
+            "max_queue_wait_ms": round(self.queue_wait_max * 1000, 2),
+            "avg_latency_ms": round(self.latency_total / attempts * 1000, 2) if attempts else 0.0,
+            "max_latency_ms": round(self.latency_max * 1000, 2),
+        }
+
+
+class LLMDispatcher:
+    """Rate-limited, concurrency-bounded, prioritized gateway for model calls.
+
+    rate_limits maps "provider/model" to requests per minute; other models get
+    default_rpm. Queue wait (rate limit plus concurrency slot) and model
+    latency are measured separately for every attempt.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        rate_limits: Optional[Dict[str, float]] = None,
+        default_rpm: float = 60.0,
+        burst: float = 5.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+    ):
+        self.concurrency = concurrency
+        self.rate_limits = dict(rate_limits or {})
+        self.default_rpm = default_rpm
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._slots = PrioritySemaphore(concurrency)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, ModelStats] = {}
+        self.active = 0
+
+    def _bucket(self, model_key: str) -> TokenBucket:
+        if model_key not in self._buckets:
+            rpm = self.rate_limits.get(model_key, self.default_rpm)
+            self._buckets[model_key] = TokenBucket(rate=rpm / 60.0, capacity=max(1.0, self.burst))
+        return self._buckets[model_key]
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter: uniformly random up to the capped exponential delay
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def call(self, provider: str, model: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        model_key = f"{provider}/{model}"
+        stats = self._stats.setdefault(model_key, ModelStats())
+        level = llm_priority.get()
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            queued_at = loop.time()
+            await self._bucket(model_key).take(level)
+            await self._slots.acquire(level)
+            started = loop.time()
+            wait = started - queued_at
+            llm_queue_wait_seconds.labels(model_key, PRIORITY_NAMES.get(level, level)).observe(wait)
+            stats.queue_wait_total += wait
+            stats.queue_wait_max = max(stats.queue_wait_max, wait)
+            self.active += 1
+            outcome = "cancelled"
+            try:
+                result = await fn()
+                stats.calls += 1
+                outcome = "ok"
+                return result
+            except Exception as e:
+                stats.errors += 1
+                outcome = "error"
+                llm_errors.labels(model_key).inc()
+                if attempt >= self.max_retries:
+                    raise
+                logging.warning(f"LLM call to {model_key} failed (attempt {attempt + 1}), retrying: {e}")
+            finally:
+                latency = loop.time() - started
+                llm_call_seconds.labels(model_key, outcome).observe(latency)
+                stats.latency_total += latency
+                stats.latency_max = max(stats.latency_max, latency)
+                self.active -= 1
+                self._slots.release()
+            stats.retries += 1
+            await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "waiting": self._slots.waiting(),
+            "throttled": {key: bucket.throttled for key, bucket in self._buckets.items()},
+            "models": {key: s.as_dict() for key, s in self._stats.items()},
+        }
+
+
+def parse_rate_limits(spec: str) -> Dict[str, float]:
+    """Parse "openai/gpt-4o-mini=500,anthropic/claude-3-5-sonnet-20241022=50" (requests per minute)"""
+    limits = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        key, _, value = item.partition("=")
+        try:
+            limits[key.strip()] = float(value)
+        except ValueError:
+            logging.error(f"Ignoring invalid LLM rate limit {item!r}")
+    return limits
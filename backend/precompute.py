@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import random
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+
+class PrecomputeScheduler:
+    """Periodically recomputes research for followed and frequently requested assets.
+
+    Each cycle takes the union of followed assets and the top_n most requested
+    ones, orders it by demand, and runs `compute` for each under a concurrency
+    limit with a small random delay per asset so workers do not stampede the
+    upstreams together. Demand counts decay every cycle so priority tracks
+    recent traffic. Only assets accepted by `known` are followed or counted;
+    a follow expires follow_ttl seconds after it was last renewed, and past
+    max_followed the least recently renewed follow makes room.
+    """
+
+    def __init__(
+        self,
+        compute: Callable[[str], Awaitable[Any]],
+        base_assets: Iterable[str] = (),
+        interval: float = 45.0,
+        concurrency: int = 2,
+        jitter: float = 5.0,
+        top_n: int = 10,
+        max_followed: int = 200,
+        follow_ttl: float = 3600.0,
+        known: Optional[Callable[[str], bool]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._compute = compute
+        self.base_assets = [a.upper() for a in base_assets]
+        self.interval = interval
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.top_n = top_n
+        self.max_followed = max_followed
+        self.follow_ttl = follow_ttl
+        self._known = known
+        self._clock = clock
+        # asset -> when it was last followed, oldest first
+        self._followed: "OrderedDict[str, float]" = OrderedDict()
+        self._demand: Counter = Counter()
+        self._queue: List[str] = []
+        self._running: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Dict[str, str] = {}
+        self.last_cycle: Optional[str] = None
+        self.cycles = 0
+        self.failures = 0
+        self.requests = 0
+        self.misses = 0
+
+    def _accepts(self, asset: str) -> bool:
+        return bool(asset) and (self._known is None or self._known(asset))
+
+    def follow(self, assets: Iterable[str]):
+        now = self._clock()
+        for asset in assets:
+            asset = str(asset).strip().upper()
+            if not self._accepts(asset):
+                continue
+            self._followed[asset] = now
+            self._followed.move_to_end(asset)
+            if len(self._followed) > self.max_followed:
+                self._followed.popitem(last=False)
+
+    def followed(self) -> List[str]:
+        """Followed assets, dropping follows that were not renewed within follow_ttl"""
+        cutoff = self._clock() - self.follow_ttl
+        while self._followed and next(iter(self._followed.values())) < cutoff:
+            self._followed.popitem(last=False)
+        return list(self._followed)
+
+    def record_request(self, asset: str, hit: bool):
+        """Count demand for an asset and whether the request found a warm result"""
+        asset = asset.upper()
+        if self._accepts(asset):
+            self._demand[asset] += 1
+        self.requests += 1
+        if not hit:
+            self.misses += 1
+
+    def plan(self) -> List[str]:
+        """Assets for the next cycle, highest demand first"""
+        candidates = set(self.base_assets) | set(self.followed())
+        candidates.update(asset for asset, _ in self._demand.most_common(self.top_n))
+        return sorted(candidates, key=lambda a: (-self._demand[a], a))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logging.error(f"Precompute cycle failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        self._queue = self.plan()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def precompute(asset: str):
+            async with semaphore:
+                await asyncio.sleep(random.uniform(0, self.jitter))
+                self._queue.remove(asset)
+                self._running.add(asset)
+                try:
+                    await self._compute(asset)
+                    self.last_run[asset] = datetime.now(timezone.utc).isoformat()
+                except Exception as e:
+                    self.failures += 1
+                    logging.error(f"Precompute failed for {asset}: {e}")
+                finally:
+                    self._running.discard(asset)
+
+        # Tasks are created in priority order, so the semaphore admits the hottest assets first
+        await asyncio.gather(*(precompute(asset) for asset in list(self._queue)))
+        for asset in list(self._demand):
+            self._demand[asset] //= 2
+            if not self._demand[asset]:
+                del self._demand[asset]
+        self.cycles += 1
+        self.last_cycle = datetime.now(timezone.utc).isoformat()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue": list(self._queue),
+            "running": sorted(self._running),
+            "followed": sorted(self.followed()),
+            "demand": dict(self._demand.most_common(self.top_n)),
+            "last_run": self.last_run,
+            "last_cycle": self.last_cycle,
+            "cycles": self.cycles,
+            "failures": self.failures,
+            "requests": self.requests,
+            "misses": self.misses,
+            "miss_rate": round(self.misses / self.requests, 4) if self.requests else 0.0,
+        }
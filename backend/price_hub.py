@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+
+class Subscriber:
+    """One connected client: its subscribed assets and a bounded outbound queue"""
+
+    def __init__(self, queue_size: int):
+        self.assets: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+
+class PriceHub:
+    """Fans price updates out to WebSocket subscribers from one shared upstream poller.
+
+    Every `interval` seconds the poller fetches all currently subscribed assets
+    in batched calls of at most batch_size assets, so the upstream request rate
+    depends on the number of distinct assets, not on the number of clients.
+    Only assets accepted by `known` can be subscribed, at most max_assets per
+    subscriber and max_total_assets across all of them. Subscribers get a
+    full snapshot on subscribe and afterwards only the fields that changed
+    (a field that disappeared from the quote is sent as null).
+    A subscriber whose queue fills up is dropped instead of buffered.
+    """
+
+    def __init__(
+        self,
+        fetch_many: Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]],
+        interval: float = 10.0,
+        queue_size: int = 32,
+        max_assets: int = 50,
+        max_total_assets: int = 500,
+        batch_size: int = 100,
+        known: Optional[Callable[[str], bool]] = None,
+    ):
+        self._fetch_many = fetch_many
+        self.interval = interval
+        self.queue_size = queue_size
+        self.max_assets = max_assets
+        self.max_total_assets = max_total_assets
+        self.batch_size = max(1, batch_size)
+        self._known = known
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.connections = 0
+        self.polls = 0
+        self.messages_sent = 0
+        self.dropped_consumers = 0
+        self.rejected = 0
+
+    def connect(self) -> Subscriber:
+        self.connections += 1
+        return Subscriber(self.queue_size)
+
+    def subscribe(self, sub: Subscriber, assets: Iterable[str]) -> List[str]:
+        added = []
+        for asset in assets:
+            asset = str(asset).strip().upper()
+            if not asset or asset in sub.assets:
+                continue
+            if (len(sub.assets) >= self.max_assets
+                    or (asset not in self._subscribers and len(self._subscribers) >= self.max_total_assets)
+                    or (self._known is not None and not self._known(asset))):
+                self.rejected += 1
+                continue
+            sub.assets.add(asset)
+            self._subscribers.setdefault(asset, set()).add(sub)
+            added.append(asset)
+            if asset in self._latest:
+                self._send(sub, {"type": "snapshot", "asset": asset, "data": self._latest[asset]})
+        if added and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._poll())
+        return added
+
+    def unsubscribe(self, sub: Subscriber, assets: Iterable[str]):
+        for asset in assets:
+            asset = str(asset).strip().upper()
+            sub.assets.discard(asset)
+            subscribers = self._subscribers.get(asset)
+            if subscribers is not None:
+                subscribers.discard(sub)
+                if not subscribers:
+                    del self._subscribers[asset]
+                    self._latest.pop(asset, None)
+
+    def disconnect(self, sub: Subscriber):
+        self.unsubscribe(sub, list(sub.assets))
+        self.connections -= 1
+
+    def _send(self, sub: Subscriber, message: Dict[str, Any]):
+        if sub.dropped:
+            return
+        try:
+            sub.queue.put_nowait(message)
+            self.messages_sent += 1
+        except asyncio.QueueFull:
+            # Slow consumer: discard its backlog and tell the sender loop to close it
+            sub.dropped = True
+            self.dropped_consumers += 1
+            while not sub.queue.empty():
+                sub.queue.get_nowait()
+            sub.queue.put_nowait(None)
+            self.unsubscribe(sub, list(sub.assets))
+
+    async def _poll(self):
+        while self._subscribers:
+            assets = list(self._subscribers)
+            quotes: Dict[str, Dict[str, Any]] = {}
+            for i in range(0, len(assets), self.batch_size):
+                try:
+                    quotes.update(await self._fetch_many(assets[i:i + self.batch_size]))
+                except Exception as e:
+                    logging.error(f"Price hub poll failed: {e}")
+            self.polls += 1
+            for asset in assets:
+                quote = quotes.get(asset)
+                if not quote:
+                    continue
+                previous = self._latest.get(asset)
+                if previous is None:
+                    message = {"type": "snapshot", "asset": asset, "data": quote}
+                else:
+                    changed = {k: v for k, v in quote.items() if previous.get(k) != v}
+                    # Fields the new quote no longer carries (e.g. "stale" once upstream
+                    # recovers) are sent as null so clients merging updates drop them
+                    changed.update({k: None for k in previous if k not in quote})
+                    if not changed:
+                        continue
+                    message = {"type": "update", "asset": asset, "data": changed}
+                self._latest[asset] = quote
+                for sub in list(self._subscribers.get(asset, ())):
+                    self._send(sub, message)
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": self.connections,
+            "assets": {asset: len(subs) for asset, subs in self._subscribers.items()},
+            "max_total_assets": self.max_total_assets,
+            "rejected": self.rejected,
+            "polls": self.polls,
+            "messages_sent": self.messages_sent,
+            "dropped_consumers": self.dropped_consumers,
+        }
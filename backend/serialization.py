@@ -0,0 +1,30 @@
+"""orjson-backed JSON responses.
+
+Hot routes return FastJSONResponse directly, which skips FastAPI's
+jsonable_encoder pass: Pydantic models are dumped once with model_dump and
+encoded by orjson, and plain dicts read from Mongo are encoded as they are.
+Datetimes keep Pydantic's format (UTC as a trailing "Z").
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content, which may contain Pydantic models, as JSON bytes"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,33 +1,105 @@
-from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks
+# Import the heavy dependencies one at a time first so the startup report can
+# attribute import cost to each of them; the imports below are then cache hits
+from lifecycle import StartupReport, LazyMongoClient, LazyDatabase, AgentRegistry
+startup_report = StartupReport()
+startup_report.time_imports(
+    "fastapi", "starlette.middleware.cors", "pydantic", "aiohttp", "numpy", "motor.motor_asyncio", "dotenv",
+    "caching", "llm_cache", "llm_dispatch", "indicators", "candle_store", "write_behind", "precompute",
+    "price_hub", "symbol_index", "metrics", "agent_context", "serialization", "compression", "circuit_breaker",
+)
+
+from fastapi import FastAPI, APIRouter, HTTPException, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Set, Tuple, Literal
 import uuid
 from datetime import datetime, timezone
 import asyncio
+import importlib
+from abc import ABC, abstractmethod
+import time
 import aiohttp
 import json
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+from caching import TTLCache, SingleFlight
+from llm_cache import LLMResponseCache
+from llm_dispatch import LLMDispatcher, PRIORITY_BACKGROUND, parse_rate_limits, priority
+from indicators import IndicatorEngine, IndicatorState
+from candle_store import CandleStore, INTERVALS
+from write_behind import WriteBehindQueue
+from precompute import PrecomputeScheduler
+from price_hub import PriceHub
+from symbol_index import SymbolIndex
+from agent_context import AgentContextStore, agent_context, agent_context_key, estimate_tokens
+from fused_llm import (FUSED_SYSTEM_MESSAGE, FusedCall, FusedSection, build_prompt, fused_call, fused_calls,
+                       split_sections)
+from serialization import FastJSONResponse
+from compression import CompressionMiddleware, CompressionStats
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from metrics import (REGISTRY, CONTENT_TYPE, Gauge, Histogram, MetricsMiddleware, MongoCommandMetrics,
+                     fallbacks)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, built on first use so a missing MONGO_URL does not break import
+client = LazyMongoClient(startup_report, event_listeners=[MongoCommandMetrics()])
+db = LazyDatabase(client)
 
 # Create the main app without a prefix
-app = FastAPI(title="Juno Research API")
+# Routes without an explicit response are encoded with orjson as well
+app = FastAPI(title="Juno Research API", default_response_class=FastJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Batch market requests are answered by a single CoinGecko /simple/price call
+MARKET_BATCH_MAX_ASSETS = int(os.environ.get('MARKET_BATCH_MAX_ASSETS', '100'))
+
+# Chat history pages are capped so a single read never scans a whole session
+CHAT_HISTORY_MAX_LIMIT = int(os.environ.get('CHAT_HISTORY_MAX_LIMIT', '100'))
+
+# Complete responses of at least COMPRESSION_MIN_SIZE bytes are sent brotli- or
+# gzip-compressed when the client accepts it; streamed responses never are
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4'))
+
+# Research time budgets: a request-level deadline and a per-agent budget within it.
+# AGENT_TIMEOUT_<NAME> (e.g. AGENT_TIMEOUT_SENTIMENT) overrides the default for one agent.
+RESEARCH_DEADLINE_SECONDS = float(os.environ.get('RESEARCH_DEADLINE_SECONDS', '25'))
+AGENT_TIMEOUT_SECONDS = float(os.environ.get('AGENT_TIMEOUT_SECONDS', '15'))
+
+# Batch research: assets per request, and how many asset analyses may run at once
+# across all batch requests (each analysis runs its agents in parallel)
+RESEARCH_BATCH_MAX_ASSETS = int(os.environ.get('RESEARCH_BATCH_MAX_ASSETS', '50'))
+RESEARCH_BATCH_CONCURRENCY = int(os.environ.get('RESEARCH_BATCH_CONCURRENCY', '8'))
+
+# Fused mode: agents that would each call the LLM share one round trip instead;
+# requests can override with "fused"
+AGENT_FUSION = os.environ.get('AGENT_FUSION', 'false').lower() == 'true'
+
+def agent_timeout(agent_name: str) -> float:
+    key = 'AGENT_TIMEOUT_' + agent_name.upper().replace('-', '')
+    return float(os.environ.get(key, AGENT_TIMEOUT_SECONDS))
+
+# Metrics owned by this module; HTTP, Mongo and LLM metrics are recorded by
+# MetricsMiddleware, MongoCommandMetrics and the LLM dispatcher
+agent_analyze_seconds = Histogram(
+    "juno_agent_analyze_duration_seconds", "Research agent analyze latency", ["agent", "status"]
+)
+llm_prompt_tokens = Histogram(
+    "juno_llm_prompt_tokens", "Estimated prompt tokens per agent LLM call, system message included", ["agent"],
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192)
+)
+coingecko_request_seconds = Histogram(
+    "juno_coingecko_request_duration_seconds", "CoinGecko request latency", ["endpoint", "status"]
+)
+
 # LLM Configuration
 EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
 
@@ -46,6 +118,8 @@ class AgentEvidence(BaseModel):
     confidence: int  # 0-100
     highlights: List[str]
     sources: List[str]
+    levels: Dict[str, List[float]] = {}  # support/resistance when the agent derives them
+    status: str = "ok"  # ok|timed_out|error
 
 class MarketView(BaseModel):
     asset: str
@@ -73,7 +147,11 @@ class ResearchResponse(BaseModel):
     market_view: MarketView
     recommendations: List[Recommendation]
     agent_evidence: List[AgentEvidence]
+    agents_dropped: List[str] = []
     disclosures: List[str]
+    cached: bool = False  # served from the research cache
+    market_data_stale: bool = False  # built on a last known good quote during an upstream outage
+    computed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class ChatMessage(BaseModel):
@@ -81,7 +159,8 @@ class ChatMessage(BaseModel):
     session_id: str
     user_id: str
     message: str
-    response: Optional[ResearchResponse] = None
+    research_id: Optional[str] = None  # stored reference into research_results
+    response: Optional[ResearchResponse] = None  # resolved on read; embedded only in legacy documents
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class ResearchQuery(BaseModel):
@@ -89,33 +168,246 @@ class ResearchQuery(BaseModel):
     asset: Optional[str] = "BTC"
     timeframe: Optional[str] = "1d"
     user_profile: Optional[UserProfile] = None
+    deadline_seconds: Optional[float] = None  # capped at RESEARCH_DEADLINE_SECONDS
+    agent_mode: Optional[Literal["llm", "deterministic", "hybrid"]] = None  # applies to every agent
+    agent_modes: Optional[Dict[str, Literal["llm", "deterministic", "hybrid"]]] = None  # per agent name
+    fused: Optional[bool] = None  # one LLM call for all LLM-backed agents; defaults to AGENT_FUSION
+
+class BatchResearchQuery(BaseModel):
+    assets: List[str]
+    query: str = ""
+    timeframe: Optional[str] = "1d"
+    user_profile: Optional[UserProfile] = None
+    deadline_seconds: Optional[float] = None  # per asset, capped at RESEARCH_DEADLINE_SECONDS
+    agent_mode: Optional[Literal["llm", "deterministic", "hybrid"]] = None
+    agent_modes: Optional[Dict[str, Literal["llm", "deterministic", "hybrid"]]] = None
+    fused: Optional[bool] = None
+
+class BatchResearchItem(BaseModel):
+    asset: str
+    status: str = "ok"  # ok|error
+    research: Optional[ResearchResponse] = None
+    error: Optional[str] = None
+
+class BatchResearchResponse(BaseModel):
+    results: List[BatchResearchItem]  # in request order
+    succeeded: int
+    failed: int
+
+class UpstreamError(Exception):
+    """An upstream answered with a status that says it is unhealthy (429 or 5xx)"""
+
+class MarketDataUnavailable(Exception):
+    """No current or last known good market data for an asset"""
+
+# Shared upstream HTTP client
+class UpstreamHttpClient:
+    """Long-lived pooled aiohttp session shared by every upstream fetcher"""
+    def __init__(self):
+        self.pool_limit = int(os.environ.get('HTTP_POOL_LIMIT', '100'))
+        self.pool_limit_per_host = int(os.environ.get('HTTP_POOL_LIMIT_PER_HOST', '20'))
+        self.dns_cache_ttl = int(os.environ.get('HTTP_DNS_CACHE_TTL', '300'))
+        self.keepalive_timeout = float(os.environ.get('HTTP_KEEPALIVE_TIMEOUT', '30'))
+        self.connect_timeout = float(os.environ.get('HTTP_CONNECT_TIMEOUT', '5'))
+        self.total_timeout = float(os.environ.get('HTTP_TOTAL_TIMEOUT', '10'))
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            timeout = aiohttp.ClientTimeout(total=self.total_timeout, connect=self.connect_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        # Created lazily as well, so code paths running outside the app lifecycle still work
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
+http_client = UpstreamHttpClient()
 
 # Crypto Data Service
 class CryptoDataService:
-    def __init__(self):
-        self.base_url = "https://api.coingecko.com/api/v3"
+    def __init__(self, http: UpstreamHttpClient, symbols: SymbolIndex):
+        self.http = http
+        self.symbols = symbols
+        self.base_url = os.environ.get('COINGECKO_BASE_URL', "https://api.coingecko.com/api/v3")
+        self.price_cache = TTLCache(
+            ttl=float(os.environ.get('PRICE_CACHE_TTL', '30')),
+            max_size=int(os.environ.get('PRICE_CACHE_MAX_SIZE', '1024')),
+        )
+        self.price_flight = SingleFlight()
+        self.ohlc_cache = TTLCache(
+            ttl=float(os.environ.get('OHLC_CACHE_TTL', '300')),
+            max_size=int(os.environ.get('OHLC_CACHE_MAX_SIZE', '256')),
+        )
+        # Empty OHLC answers (unknown coin, upstream failure) are cached briefly
+        self.ohlc_negative_ttl = float(os.environ.get('OHLC_NEGATIVE_TTL', '60'))
+        self.ohlc_flight = SingleFlight()
+        # Every CoinGecko call goes through one breaker: repeated failures or slow
+        # calls open it, and calls then fail fast until a half-open probe succeeds
+        self.breaker = CircuitBreaker(
+            "coingecko",
+            failure_threshold=int(os.environ.get('UPSTREAM_BREAKER_FAILURES', '5')),
+            reset_timeout=float(os.environ.get('UPSTREAM_BREAKER_RESET', '30')),
+            half_open_max_calls=int(os.environ.get('UPSTREAM_BREAKER_PROBES', '1')),
+            call_timeout=float(os.environ.get('UPSTREAM_CALL_TIMEOUT', '5')),
+        )
+        # Last known good quote per coin, served marked stale when upstream cannot
+        # answer within PRICE_STALE_AFTER seconds (the fetch carries on in the background)
+        self.last_good = TTLCache(
+            ttl=float(os.environ.get('PRICE_STALE_TTL', '3600')),
+            max_size=int(os.environ.get('PRICE_STALE_MAX_SIZE', '4096')),
+        )
+        self.stale_after = float(os.environ.get('PRICE_STALE_AFTER', '1.5'))
+        self.stale_served = 0
+        self._background: Set[asyncio.Task] = set()
     
+    def resolve_coin_id(self, symbol: str) -> str:
+        return self.symbols.coin_id(symbol)
+
     async def get_price_data(self, symbol: str) -> Dict[str, Any]:
         """Get current price and basic market data"""
+        data = await self.get_price_data_many([symbol])
+        return data.get(symbol.upper(), {})
+
+    async def get_price_data_many(self, symbols: List[str], refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Get market data for several assets in one upstream round trip, keyed by symbol.
+
+        refresh=True skips cached quotes (and refreshes the cache with the result).
+        """
+        coin_ids = {symbol.upper(): self.resolve_coin_id(symbol) for symbol in symbols}
+
+        quotes: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for coin_id in dict.fromkeys(coin_ids.values()):
+            cached = None if refresh else self.price_cache.get(coin_id)
+            if cached is not None:
+                quotes[coin_id] = cached
+            else:
+                missing.append(coin_id)
+
+        if missing:
+            fetched = await self._fetch_or_stale(missing)
+            for coin_id in missing:
+                quotes[coin_id] = fetched.get(coin_id) or self.stale_quote(coin_id)
+
+        return {symbol: quotes.get(coin_id, {}) for symbol, coin_id in coin_ids.items()}
+
+    async def _fetch_or_stale(self, coin_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch quotes; when every coin has a stale fallback, wait at most stale_after for upstream"""
+        # Concurrent misses for the same coin share a single upstream request
+        fetch = asyncio.ensure_future(self.price_flight.do_many(coin_ids, self._fetch_prices))
+        if not all(self.last_good.get(coin_id) is not None for coin_id in coin_ids):
+            return await fetch
+        done, _ = await asyncio.wait({fetch}, timeout=self.stale_after)
+        if fetch in done:
+            return fetch.result()
+        # Slow upstream: answer from the last good quotes and let the fetch refresh them
+        self._background.add(fetch)
+        fetch.add_done_callback(self._background.discard)
+        return {}
+
+    def stale_quote(self, coin_id: str) -> Dict[str, Any]:
+        entry = self.last_good.get(coin_id)
+        if entry is None:
+            return {}
+        quote, fetched_at = entry
+        self.stale_served += 1
+        fallbacks.labels("price_stale").inc()
+        return {**quote, "stale": True, "as_of": fetched_at.isoformat()}
+
+    async def _get_json(self, endpoint: str, path: str, params: Dict[str, str]) -> Any:
+        """GET a CoinGecko endpoint through the circuit breaker"""
+        return await self.breaker.call(lambda: self._request_json(endpoint, path, params))
+
+    async def _request_json(self, endpoint: str, path: str, params: Dict[str, str]) -> Any:
+        """GET a CoinGecko endpoint, recording latency by endpoint and HTTP status"""
+        started = time.perf_counter()
+        status = "error"
         try:
-            coin_map = {"BTC": "bitcoin", "ETH": "ethereum", "SOL": "solana"}
-            coin_id = coin_map.get(symbol.upper(), symbol.lower())
-            
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/simple/price"
-                params = {
-                    "ids": coin_id,
-                    "vs_currencies": "usd",
-                    "include_24hr_change": "true",
-                    "include_market_cap": "true",
-                    "include_24hr_vol": "true"
-                }
-                async with session.get(url, params=params) as response:
-                    data = await response.json()
-                    return data.get(coin_id, {})
+            session = await self.http.get_session()
+            async with session.get(f"{self.base_url}{path}", params=params) as response:
+                status = response.status
+                # Rate limiting and server errors count against the breaker; other
+                # client errors are answers about the request, not upstream health
+                if response.status == 429 or response.status >= 500:
+                    raise UpstreamError(f"CoinGecko {endpoint} returned HTTP {response.status}")
+                return await response.json()
+        finally:
+            coingecko_request_seconds.labels(endpoint, status).observe(time.perf_counter() - started)
+
+    async def _fetch_prices(self, coin_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            params = {
+                "ids": ",".join(coin_ids),
+                "vs_currencies": "usd",
+                "include_24hr_change": "true",
+                "include_market_cap": "true",
+                "include_24hr_vol": "true"
+            }
+            data = await self._get_json("simple/price", "/simple/price", params)
+        except CircuitOpenError:
+            return {}
         except Exception as e:
             logging.error(f"Error fetching price data: {e}")
             return {}
+
+        quotes = {}
+        fetched_at = datetime.now(timezone.utc)
+        for coin_id in coin_ids:
+            quote = data.get(coin_id) if isinstance(data, dict) else None
+            if quote:
+                self.price_cache.set(coin_id, quote)
+                self.last_good.set(coin_id, (quote, fetched_at))
+                quotes[coin_id] = quote
+        return quotes
+
+    async def get_ohlc(self, symbol: str, days: int = 30) -> List[List[float]]:
+        """Get OHLC candles as [timestamp_ms, open, high, low, close] rows, oldest first"""
+        coin_id = self.resolve_coin_id(symbol)
+        key = (coin_id, days)
+        cached = self.ohlc_cache.get(key)
+        if cached is not None:
+            return cached
+
+        candles = await self.ohlc_flight.do(key, lambda: self._fetch_ohlc(coin_id, days))
+        self.ohlc_cache.set(key, candles, ttl=None if candles else self.ohlc_negative_ttl)
+        return candles
+
+    async def _fetch_ohlc(self, coin_id: str, days: int) -> List[List[float]]:
+        try:
+            params = {"vs_currency": "usd", "days": str(days)}
+            data = await self._get_json("coins/ohlc", f"/coins/{coin_id}/ohlc", params)
+        except CircuitOpenError:
+            return []
+        except Exception as e:
+            logging.error(f"Error fetching OHLC data: {e}")
+            return []
+        if not isinstance(data, list):
+            return []
+        return sorted((row for row in data if isinstance(row, list) and len(row) >= 5), key=lambda row: row[0])
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {**self.price_cache.stats(), **self.price_flight.stats()}
+
+    def upstream_stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.stats(),
+            "last_good": len(self.last_good),
+            "stale_served": self.stale_served,
+            "background_fetches": len(self._background),
+        }
     
     async def get_market_sentiment(self, symbol: str) -> Dict[str, Any]:
         """Mock sentiment data for now"""
@@ -126,239 +418,986 @@ class CryptoDataService:
             "funding_rate": 0.01
         }
 
-crypto_service = CryptoDataService()
+# Ticker/name index over the bundled coin-list snapshot, built at startup
+symbol_index = SymbolIndex()
+crypto_service = CryptoDataService(http_client, symbol_index)
+
+# Live prices for WebSocket clients come from one shared poller. Only symbols the
+# index knows can be subscribed; PRICE_HUB_MAX_TOTAL_ASSETS caps distinct assets
+# across all clients, polled in chunks of MARKET_BATCH_MAX_ASSETS
+price_hub = PriceHub(
+    lambda assets: crypto_service.get_price_data_many(assets, refresh=True),
+    interval=float(os.environ.get('PRICE_HUB_INTERVAL', '10')),
+    queue_size=int(os.environ.get('PRICE_HUB_QUEUE_SIZE', '32')),
+    max_assets=int(os.environ.get('PRICE_HUB_MAX_ASSETS', '50')),
+    max_total_assets=int(os.environ.get('PRICE_HUB_MAX_TOTAL_ASSETS', '500')),
+    batch_size=MARKET_BATCH_MAX_ASSETS,
+    known=lambda asset: symbol_index.resolve(asset) is not None,
+)
+
+# Candle history for technical analysis, backfilled incrementally from CoinGecko
+# Only coins the symbol index knows get candle series; CANDLE_MAX_SERIES bounds
+# the (asset, interval) series mirrored in memory
+CANDLE_MAX_SERIES = int(os.environ.get('CANDLE_MAX_SERIES', '512'))
+candle_store = CandleStore(
+    lambda: db, crypto_service.get_ohlc,
+    known=lambda asset: symbol_index.resolve(asset) is not None,
+    max_series=CANDLE_MAX_SERIES,
+)
+CANDLE_BACKFILL_ASSETS = [a.strip().upper() for a in os.environ.get('CANDLE_BACKFILL_ASSETS', 'BTC,ETH,SOL').split(',') if a.strip()]
+CANDLE_BACKFILL_INTERVALS = [i.strip() for i in os.environ.get('CANDLE_BACKFILL_INTERVALS', '4h').split(',') if i.strip() in INTERVALS]
+CANDLE_BACKFILL_EVERY = float(os.environ.get('CANDLE_BACKFILL_EVERY', '900'))
+
+# Chat messages are persisted off the request path in batches
+chat_writer = WriteBehindQueue(
+    lambda: db.chat_messages,
+    name="chat_messages",
+    max_batch=int(os.environ.get('CHAT_WRITE_BATCH_SIZE', '100')),
+    flush_interval=float(os.environ.get('CHAT_WRITE_FLUSH_INTERVAL', '0.5')),
+    max_queue=int(os.environ.get('CHAT_WRITE_QUEUE_SIZE', '10000')),
+    put_timeout=float(os.environ.get('CHAT_WRITE_PUT_TIMEOUT', '2')),
+)
+
+# Recent research is reused for identical queries within a short freshness window
+research_cache = TTLCache(
+    ttl=float(os.environ.get('RESEARCH_CACHE_TTL', '60')),
+    max_size=int(os.environ.get('RESEARCH_CACHE_MAX_SIZE', '512')),
+)
+research_flight = SingleFlight()
+
+# Research results are stored once in their own collection and referenced by id
+research_writer = WriteBehindQueue(
+    lambda: db.research_results,
+    name="research_results",
+    max_batch=int(os.environ.get('CHAT_WRITE_BATCH_SIZE', '100')),
+    flush_interval=float(os.environ.get('CHAT_WRITE_FLUSH_INTERVAL', '0.5')),
+    max_queue=int(os.environ.get('CHAT_WRITE_QUEUE_SIZE', '10000')),
+    put_timeout=float(os.environ.get('CHAT_WRITE_PUT_TIMEOUT', '2')),
+)
+
+# Agent LLM responses are reused while the market snapshot stays in the same buckets
+llm_cache = LLMResponseCache(
+    ttl=float(os.environ.get('LLM_CACHE_TTL', '300')),
+    max_size=int(os.environ.get('LLM_CACHE_MAX_SIZE', '2048')),
+    collection=(lambda: db.llm_cache) if os.environ.get('LLM_CACHE_PERSIST', 'false').lower() == 'true' else None,
+    price_step=float(os.environ.get('LLM_CACHE_PRICE_STEP', '0.005')),
+    change_step=float(os.environ.get('LLM_CACHE_CHANGE_STEP', '0.5')),
+    volume_step=float(os.environ.get('LLM_CACHE_VOLUME_STEP', '0.1')),
+)
+
+# Per-session agent history; AGENT_CONTEXT_TURNS=0 keeps every agent call stateless.
+# With history on, research and LLM answers are cached per session, not shared.
+agent_contexts = AgentContextStore(
+    max_turns=int(os.environ.get('AGENT_CONTEXT_TURNS', '0')),
+    max_tokens=int(os.environ.get('AGENT_CONTEXT_TOKENS', '1500')),
+    summary_tokens=int(os.environ.get('AGENT_CONTEXT_SUMMARY_TOKENS', '100')),
+    ttl=float(os.environ.get('AGENT_CONTEXT_TTL', '1800')),
+    max_sessions=int(os.environ.get('AGENT_CONTEXT_MAX_SESSIONS', '1000')),
+)
+
+# Every model call is rate limited per provider/model (requests per minute),
+# bounded in concurrency and retried with jittered backoff
+llm_dispatcher = LLMDispatcher(
+    concurrency=int(os.environ.get('LLM_CONCURRENCY', '8')),
+    rate_limits=parse_rate_limits(os.environ.get(
+        'LLM_RATE_LIMITS', 'openai/gpt-4o-mini=500,anthropic/claude-3-5-sonnet-20241022=50'
+    )),
+    default_rpm=float(os.environ.get('LLM_DEFAULT_RPM', '60')),
+    burst=float(os.environ.get('LLM_BURST', '5')),
+    max_retries=int(os.environ.get('LLM_MAX_RETRIES', '2')),
+    backoff_base=float(os.environ.get('LLM_BACKOFF_BASE', '0.5')),
+    backoff_max=float(os.environ.get('LLM_BACKOFF_MAX', '8')),
+)
 
 # AI Agents
-class SentimentAgent:
-    def __init__(self):
-        self.llm = LlmChat(
+AGENT_MODES = ("llm", "deterministic", "hybrid")
+AgentMode = Literal["llm", "deterministic", "hybrid"]
+
+def parse_llm_json(response: Any) -> Optional[Dict[str, Any]]:
+    """Extract the JSON object from an LLM reply, tolerating code fences and surrounding prose"""
+    if not isinstance(response, str):
+        return None
+    start, end = response.find("{"), response.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        result = json.loads(response[start:end + 1])
+    except ValueError:
+        return None
+    return result if isinstance(result, dict) else None
+
+def parse_levels(raw: Any) -> Dict[str, List[float]]:
+    """Normalize LLM-provided support/resistance levels into sorted float lists"""
+    levels = {"support": [], "resistance": []}
+    if not isinstance(raw, dict):
+        return levels
+    for side in levels:
+        values = raw.get(side) or []
+        if not isinstance(values, list):
+            values = [values]
+        for value in values:
+            try:
+                levels[side].append(float(str(value).replace("$", "").replace(",", "")))
+            except ValueError:
+                continue
+        levels[side].sort()
+    return levels
+
+_llm_sdk = None
+
+def llm_sdk():
+    """The emergentintegrations chat module, imported on first LLM use"""
+    global _llm_sdk
+    if _llm_sdk is None:
+        with startup_report.measure("init", "emergentintegrations"):
+            _llm_sdk = importlib.import_module("emergentintegrations.llm.chat")
+    return _llm_sdk
+
+class AgentBase:
+    """Agent LLM settings. Every call gets a fresh SDK session, so no history accumulates
+    there across users; bounded per-session history lives in agent_contexts instead."""
+    session_id = ""
+    system_message = ""
+    provider = "openai"
+    model = "gpt-4o-mini"
+
+    def new_chat(self) -> Any:
+        return llm_sdk().LlmChat(
             api_key=EMERGENT_LLM_KEY,
-            session_id="sentiment-agent",
-            system_message="""You are a crypto sentiment analysis expert. Analyze market sentiment across social media, news, and funding data. 
+            session_id=f"{self.session_id}-{uuid.uuid4().hex}",
+            system_message=self.system_message
+        ).with_model(self.provider, self.model)
+
+class ResearchAgent(AgentBase, ABC):
+    """Research agent with an explicit execution mode.
+
+    llm: evidence comes from the model. deterministic: rule-based evidence,
+    no LLM round trip. hybrid: rule-based score, model output merged into
+    highlights and levels. AGENT_MODE sets the default for every agent and
+    AGENT_MODE_<NAME> for one agent; requests can override both.
+    """
+    name = ""
+    default_mode = "deterministic"
+    supported_modes: Tuple[str, ...] = ("deterministic",)
+    # Shape of the agent's JSON answer; agents with a schema can take part in fused calls
+    llm_schema: Optional[Dict[str, Any]] = None
+
+    def resolve_mode(self, requested: Optional[str] = None) -> str:
+        env_key = 'AGENT_MODE_' + self.name.upper().replace('-', '')
+        for mode in (requested, os.environ.get(env_key), os.environ.get('AGENT_MODE')):
+            if mode in self.supported_modes:
+                return mode
+        return self.default_mode
+
+    @abstractmethod
+    async def llm_prompt(self, asset: str, market_data: Dict) -> str:
+        """The agent's question to the model, on its own or as a section of a fused call"""
+
+    async def ask_llm(self, asset: str, market_data: Dict, prompt: str) -> str:
+        fused = fused_call.get()
+        if fused is not None and self.name.lower() in fused.names:
+            section = await fused.section(self.name.lower())
+            if section is not None:
+                return json.dumps(section)
+            fallbacks.labels("fused_validation").inc()
+        context = agent_contexts.get(self.name)
+        history = context.render() if context is not None else ""
+        text = f"{history}\n\n{prompt}" if history else prompt
+        llm_prompt_tokens.labels(self.name).observe(estimate_tokens(self.system_message) + estimate_tokens(text))
+        message = llm_sdk().UserMessage(text=text)
+        # Answers that depended on a session's history are cached under that history
+        response = await llm_cache.get_or_call(
+            llm_cache.key(self.name, asset, market_data, self.system_message + history),
+            lambda: llm_dispatcher.call(self.provider, self.model, lambda: self.new_chat().send_message(message))
+        )
+        if context is not None and isinstance(response, str):
+            context.add(prompt, response)
+        return response
+
+    @abstractmethod
+    async def analyze(self, asset: str, market_data: Dict, mode: Optional[str] = None) -> AgentEvidence:
+        """Evidence for the asset in the resolved mode"""
+
+class SentimentAgent(ResearchAgent):
+    name = "Sentiment"
+    session_id = "sentiment-agent"
+    system_message = """You are a crypto sentiment analysis expert. Analyze market sentiment across social media, news, and funding data. 
             Return a sentiment score from -2 (extremely bearish) to +2 (extremely bullish) with confidence 0-100.
             Format your response as JSON with: score, confidence, highlights, sources."""
-        ).with_model("openai", "gpt-4o-mini")
-    
-    async def analyze(self, asset: str, market_data: Dict) -> AgentEvidence:
-        try:
+    default_mode = "llm"
+    supported_modes = AGENT_MODES
+    llm_schema = {"score": float, "confidence": float, "highlights": [str], "sources": [str]}
+
+    def deterministic_evidence(self, market_data: Dict, sentiment_data: Dict) -> AgentEvidence:
+        change = market_data.get('usd_24h_change', 0) or 0
+        score = 0.5 if change > 0 else -0.5
+        return AgentEvidence(
+            agent=self.name,
+            score=score,
+            confidence=60,
+            highlights=[
+                f"24h change: {change:.2f}%",
+                f"Fear/Greed index: {sentiment_data.get('fear_greed_index', 50)}"
+            ],
+            sources=["CoinGecko"]
+        )
+
+    async def llm_prompt(self, asset: str, market_data: Dict, sentiment_data: Optional[Dict] = None) -> str:
+        if sentiment_data is None:
             sentiment_data = await crypto_service.get_market_sentiment(asset)
-            
-            prompt = f"""Analyze sentiment for {asset}:
+        return f"""Analyze sentiment for {asset}:
             Price: ${market_data.get('usd', 0)}
             24h Change: {market_data.get('usd_24h_change', 0)}%
             Volume: ${market_data.get('usd_24h_vol', 0)}
             Fear/Greed: {sentiment_data.get('fear_greed_index', 50)}
             
             Provide sentiment analysis."""
+    
+    async def analyze(self, asset: str, market_data: Dict, mode: Optional[str] = None) -> AgentEvidence:
+        try:
+            mode = self.resolve_mode(mode)
+            sentiment_data = await crypto_service.get_market_sentiment(asset)
+            baseline = self.deterministic_evidence(market_data, sentiment_data)
+            if mode == "deterministic":
+                return baseline
             
-            message = UserMessage(text=prompt)
-            response = await self.llm.send_message(message)
+            prompt = await self.llm_prompt(asset, market_data, sentiment_data)
+            response = await self.ask_llm(asset, market_data, prompt)
             
-            # Parse LLM response or provide fallback
-            try:
-                result = json.loads(response)
-                return AgentEvidence(
-                    agent="Sentiment",
-                    score=result.get("score", 0),
-                    confidence=result.get("confidence", 50),
-                    highlights=result.get("highlights", ["Market sentiment analysis"]),
-                    sources=result.get("sources", ["CoinGecko", "Social Media"])
-                )
-            except:
-                # Fallback if JSON parsing fails
-                score = 0.5 if market_data.get('usd_24h_change', 0) > 0 else -0.5
-                return AgentEvidence(
-                    agent="Sentiment",
-                    score=score,
-                    confidence=60,
-                    highlights=[f"24h change: {market_data.get('usd_24h_change', 0):.2f}%"],
-                    sources=["CoinGecko"]
-                )
+            # Parse LLM response or fall back to the rule-based evidence
+            result = parse_llm_json(response)
+            if result is None:
+                fallbacks.labels("sentiment_json_parse").inc()
+                return baseline
+            highlights = result.get("highlights") or ["Market sentiment analysis"]
+            if not isinstance(highlights, list):
+                highlights = [str(highlights)]
+
+            if mode == "hybrid":
+                baseline.highlights.extend(str(h) for h in highlights)
+                baseline.sources.append("LLM sentiment review")
+                return baseline
+
+            return AgentEvidence(
+                agent=self.name,
+                score=min(2, max(-2, float(result.get("score", 0)))),
+                confidence=int(result.get("confidence", 50)),
+                highlights=[str(h) for h in highlights],
+                sources=result.get("sources", ["CoinGecko", "Social Media"])
+            )
         except Exception as e:
             logging.error(f"Sentiment analysis error: {e}")
+            fallbacks.labels("sentiment_error").inc()
             return AgentEvidence(
-                agent="Sentiment",
+                agent=self.name,
                 score=0,
                 confidence=30,
                 highlights=["Error in sentiment analysis"],
-                sources=[]
+                sources=[],
+                status="error"
             )
 
-class TechnicalAgent:
-    def __init__(self):
-        self.llm = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id="technical-agent",
-            system_message="""You are a crypto technical analysis expert. Analyze price action, support/resistance levels, and chart patterns.
+class TechnicalAgent(ResearchAgent):
+    name = "Technical"
+    session_id = "technical-agent"
+    system_message = """You are a crypto technical analysis expert. Analyze price action, support/resistance levels, and chart patterns.
             Return a technical score from -2 (strong sell) to +2 (strong buy) with confidence 0-100.
             Format your response as JSON with: score, confidence, levels (support/resistance), patterns."""
-        ).with_model("openai", "gpt-4o-mini")
-    
-    async def analyze(self, asset: str, market_data: Dict) -> AgentEvidence:
-        try:
-            current_price = market_data.get('usd', 0)
-            change_24h = market_data.get('usd_24h_change', 0)
-            
-            prompt = f"""Technical analysis for {asset}:
-            Current Price: ${current_price}
-            24h Change: {change_24h}%
+    default_mode = "deterministic"
+    supported_modes = AGENT_MODES
+    llm_schema = {
+        "score": float,
+        "confidence": float,
+        "levels": {"support": [float], "resistance": [float]},
+        "patterns": [str],
+    }
+
+    # Candle interval read from the candle store for indicators
+    interval = os.environ.get('TECHNICAL_INTERVAL', '4h')
+    min_candles = 35
+    state_ttl = float(os.environ.get('TECHNICAL_STATE_TTL', '86400'))
+
+    def __init__(self):
+        super().__init__()
+        self.engine = IndicatorEngine()
+        # Per-asset indicator state, advanced incrementally as new candles arrive;
+        # least recently used states are dropped and rebuilt from the store on demand
+        self._states = TTLCache(ttl=self.state_ttl, max_size=CANDLE_MAX_SERIES)
+
+    def momentum_evidence(self, market_data: Dict) -> AgentEvidence:
+        current_price = market_data.get('usd', 0)
+        change_24h = market_data.get('usd_24h_change', 0) or 0
+
+        # Simple technical score based on price action
+        score = min(2, max(-2, change_24h / 10))  # Scale to -2 to +2
+
+        return AgentEvidence(
+            agent=self.name,
+            score=score,
+            confidence=70,
+            highlights=[f"Price momentum: {change_24h:.2f}%", f"Current level: ${current_price}"],
+            sources=["Price Action", "Volume Analysis"]
+        )
+
+    async def indicator_state(self, asset: str) -> Optional[IndicatorState]:
+        """Advance the cached state with candles newer than it, or build it from the stored history"""
+        state = self._states.get(asset)
+        if state is not None:
+            # Only candles newer than the state are read from the store
+            fresh = await candle_store.read_range(asset, self.interval, start=int(state.last_timestamp) + 1)
+            for ts, high, low, close in zip(fresh["t"], fresh["high"], fresh["low"], fresh["close"]):
+                state = self.engine.update(state, high, low, close, ts)
+        else:
+            candles = await candle_store.read_range(asset, self.interval)
+            if candles["t"].shape[0] < self.min_candles:
+                return None
+            _, state = self.engine.compute(candles["high"], candles["low"], candles["close"], timestamps=candles["t"])
+        self._states.set(asset, state)
+        return state
+
+    async def llm_prompt(self, asset: str, market_data: Dict) -> str:
+        return f"""Technical analysis for {asset}:
+            Current Price: ${market_data.get('usd', 0)}
+            24h Change: {market_data.get('usd_24h_change', 0)}%
             Volume: ${market_data.get('usd_24h_vol', 0)}
             
             Analyze technical levels and patterns."""
-            
-            message = UserMessage(text=prompt)
-            response = await self.llm.send_message(message)
-            
-            # Simple technical score based on price action
-            score = min(2, max(-2, change_24h / 10))  # Scale to -2 to +2
-            
+
+    async def deterministic_evidence(self, asset: str, market_data: Dict) -> AgentEvidence:
+        await candle_store.ensure_fresh(asset, self.interval)
+        state = await self.indicator_state(asset.upper())
+        if state is None:
+            fallbacks.labels("technical_momentum").inc()
+            return self.momentum_evidence(market_data)
+
+        snap = self.engine.snapshot(state)
+        change_24h = market_data.get('usd_24h_change', 0) or 0
+        price = market_data.get('usd') or snap.price
+
+        # Trend: price against the EMAs that have enough history behind them
+        trend = 0.0
+        for period, value in snap.emas.items():
+            if snap.candles >= period:
+                trend += 0.4 if price > value else -0.4
+        # RSI: momentum inside 30-70, mean reversion outside it
+        if snap.rsi > 70:
+            rsi_score = -0.5
+        elif snap.rsi < 30:
+            rsi_score = 0.5
+        else:
+            rsi_score = (snap.rsi - 50) / 40
+        # MACD histogram normalized by ATR
+        macd_score = max(-0.5, min(0.5, snap.macd_histogram / snap.atr)) if snap.atr else 0.0
+        score = min(2, max(-2, trend + rsi_score + macd_score + change_24h / 20))
+
+        highlights = [
+            f"RSI({self.engine.config.rsi_period}): {snap.rsi:.1f}",
+            f"MACD histogram: {snap.macd_histogram:+.4g}",
+            f"Price momentum: {change_24h:.2f}%",
+            f"ATR: {snap.atr / snap.price * 100:.2f}% of price",
+        ]
+        if snap.bb_upper == snap.bb_upper:  # not NaN
+            if price > snap.bb_upper:
+                highlights.append("Trading above the upper Bollinger band")
+            elif price < snap.bb_lower:
+                highlights.append("Trading below the lower Bollinger band")
+
+        return AgentEvidence(
+            agent=self.name,
+            score=score,
+            confidence=70 if snap.candles >= 100 else 55,
+            highlights=highlights,
+            sources=["Price Action", "RSI/MACD/EMA/ATR", "Pivot levels"],
+            levels=snap.levels
+        )
+    
+    async def analyze(self, asset: str, market_data: Dict, mode: Optional[str] = None) -> AgentEvidence:
+        try:
+            mode = self.resolve_mode(mode)
+            baseline = await self.deterministic_evidence(asset, market_data)
+            if mode == "deterministic":
+                return baseline
+
+            prompt = await self.llm_prompt(asset, market_data)
+            response = await self.ask_llm(asset, market_data, prompt)
+
+            result = parse_llm_json(response)
+            if result is None:
+                fallbacks.labels("technical_json_parse").inc()
+                return baseline
+            levels = parse_levels(result.get("levels"))
+            patterns = result.get("patterns") or []
+            if not isinstance(patterns, list):
+                patterns = [patterns]
+            pattern_highlights = [f"Pattern: {p}" for p in patterns]
+            level_highlights = [
+                f"{side.capitalize()}: {', '.join(f'${v:,.2f}' for v in values)}"
+                for side, values in levels.items() if values
+            ]
+
+            if mode == "hybrid":
+                baseline.highlights.extend(pattern_highlights + level_highlights)
+                for side, values in levels.items():
+                    baseline.levels[side] = sorted(set(baseline.levels.get(side, []) + values))
+                baseline.sources.append("LLM chart review")
+                return baseline
+
             return AgentEvidence(
-                agent="Technical",
-                score=score,
-                confidence=70,
-                highlights=[f"Price momentum: {change_24h:.2f}%", f"Current level: ${current_price}"],
-                sources=["Price Action", "Volume Analysis"]
+                agent=self.name,
+                score=min(2, max(-2, float(result.get("score", baseline.score)))),
+                confidence=int(result.get("confidence", 50)),
+                highlights=pattern_highlights + level_highlights or baseline.highlights,
+                sources=["LLM chart review"],
+                levels=levels
             )
         except Exception as e:
             logging.error(f"Technical analysis error: {e}")
             return AgentEvidence(
-                agent="Technical",
+                agent=self.name,
                 score=0,
                 confidence=30,
                 highlights=["Error in technical analysis"],
-                sources=[]
+                sources=[],
+                status="error"
             )
 
-class MacroAgent:
-    def __init__(self):
-        self.llm = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id="macro-agent",
-            system_message="""You are a macro economic analyst for crypto markets. Analyze global economic factors affecting crypto.
+class MacroAgent(ResearchAgent):
+    name = "Macro"
+    session_id = "macro-agent"
+    system_message = """You are a macro economic analyst for crypto markets. Analyze global economic factors affecting crypto.
             Consider DXY, interest rates, risk-on/risk-off sentiment, correlations with traditional markets."""
-        ).with_model("openai", "gpt-4o-mini")
+
+    async def llm_prompt(self, asset: str, market_data: Dict) -> str:
+        return f"""Macro backdrop for {asset}:
+            Current Price: ${market_data.get('usd', 0)}
+            24h Change: {market_data.get('usd_24h_change', 0)}%
+
+            Assess liquidity, rates, dollar strength and risk appetite for this asset."""
     
-    async def analyze(self, asset: str, market_data: Dict) -> AgentEvidence:
+    async def analyze(self, asset: str, market_data: Dict, mode: Optional[str] = None) -> AgentEvidence:
         return AgentEvidence(
-            agent="Macro",
+            agent=self.name,
             score=0.3,  # Slightly positive macro outlook
             confidence=50,
             highlights=["Global liquidity conditions", "Risk-on sentiment"],
             sources=["Economic indicators", "Central bank policy"]
         )
 
-class OnChainAgent:
-    def __init__(self):
-        self.llm = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id="onchain-agent",
-            system_message="""You are an on-chain analysis expert. Analyze blockchain metrics, whale movements, and network activity."""
-        ).with_model("openai", "gpt-4o-mini")
+class OnChainAgent(ResearchAgent):
+    name = "On-Chain"
+    session_id = "onchain-agent"
+    system_message = """You are an on-chain analysis expert. Analyze blockchain metrics, whale movements, and network activity."""
+
+    async def llm_prompt(self, asset: str, market_data: Dict) -> str:
+        return f"""On-chain activity for {asset}:
+            Current Price: ${market_data.get('usd', 0)}
+            Volume: ${market_data.get('usd_24h_vol', 0)}
+            Market Cap: ${market_data.get('usd_market_cap', 0)}
+
+            Assess network activity, exchange flows and whale movements."""
     
-    async def analyze(self, asset: str, market_data: Dict) -> AgentEvidence:
+    async def analyze(self, asset: str, market_data: Dict, mode: Optional[str] = None) -> AgentEvidence:
         return AgentEvidence(
-            agent="On-Chain",
+            agent=self.name,
             score=0.1,
             confidence=60,
             highlights=["Network activity stable", "No major whale movements"],
             sources=["Blockchain data", "Whale tracking"]
         )
 
-class JunoAdvisor:
-    def __init__(self):
-        self.llm = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id="juno-advisor",
-            system_message="""You are Juno, an AI crypto research advisor. Synthesize multi-agent analysis into clear, actionable insights.
+class FusedResearchAgent(AgentBase):
+    """Asks the questions of several research agents in one LLM call and splits the answer per agent"""
+    name = "Fused"
+    session_id = "fused-agents"
+    system_message = FUSED_SYSTEM_MESSAGE
+
+    async def ask(self, asset: str, market_data: Dict, participants: List[ResearchAgent]) -> Dict[str, Dict[str, Any]]:
+        """Validated answer sections keyed by lowercased agent name; empty when the call fails"""
+        try:
+            sections = [
+                FusedSection(agent.name.lower(), agent.system_message, await agent.llm_prompt(asset, market_data),
+                             agent.llm_schema)
+                for agent in participants
+            ]
+            prompt = build_prompt(asset, sections)
+            llm_prompt_tokens.labels(self.name).observe(estimate_tokens(self.system_message) + estimate_tokens(prompt))
+            message = llm_sdk().UserMessage(text=prompt)
+            # The participants' system prompts shape the answer, so they version the cache key too
+            version = self.system_message + "".join(agent.system_message for agent in participants)
+            response = await llm_cache.get_or_call(
+                llm_cache.key(f"{self.name}:{','.join(s.name for s in sections)}", asset, market_data, version),
+                lambda: llm_dispatcher.call(self.provider, self.model, lambda: self.new_chat().send_message(message))
+            )
+        except Exception as e:
+            logging.error(f"Fused LLM call error: {e}")
+            fused_calls.labels("error").inc()
+            return {}
+        return split_sections(parse_llm_json(response), sections)
+
+class JunoAdvisor(AgentBase):
+    session_id = "juno-advisor"
+    system_message = """You are Juno, an AI crypto research advisor. Synthesize multi-agent analysis into clear, actionable insights.
             Always emphasize risk management and uncertainty. Provide clear reasoning and alternatives."""
-        ).with_model("anthropic", "claude-3-5-sonnet-20241022")
+    provider = "anthropic"
+    model = "claude-3-5-sonnet-20241022"
+
+# Agents are built on first use, or at startup when AGENT_WARMUP=true
+agents = AgentRegistry(startup_report)
+agents.register("sentiment", SentimentAgent)
+agents.register("technical", TechnicalAgent)
+agents.register("macro", MacroAgent)
+agents.register("onchain", OnChainAgent)
+agents.register("fused", FusedResearchAgent)
+agents.register("juno", JunoAdvisor)
+
+RESEARCH_AGENT_NAMES = ("sentiment", "technical", "macro", "onchain")
+
+RESEARCH_DISCLOSURES = [
+    "This is research, not financial advice.",
+    "Crypto markets are highly volatile and risky.",
+    "Past performance does not guarantee future results."
+]
+
+# Research orchestration
+def research_agents() -> List[ResearchAgent]:
+    return agents.get_many(RESEARCH_AGENT_NAMES)
+
+def research_budget(query: ResearchQuery) -> float:
+    """Seconds the research request may take"""
+    budget = RESEARCH_DEADLINE_SECONDS
+    if query.deadline_seconds is not None and query.deadline_seconds > 0:
+        budget = min(budget, query.deadline_seconds)
+    return budget
+
+def research_deadline(query: ResearchQuery) -> float:
+    """Absolute event-loop time by which the research request must be answered"""
+    return asyncio.get_running_loop().time() + research_budget(query)
+
+def requested_mode(query: ResearchQuery, agent: ResearchAgent) -> Optional[str]:
+    """Per-request execution mode for an agent; None defers to config and the agent default"""
+    if query.agent_modes and agent.name in query.agent_modes:
+        return query.agent_modes[agent.name]
+    return query.agent_mode
 
-# Initialize agents
-sentiment_agent = SentimentAgent()
-technical_agent = TechnicalAgent()
-macro_agent = MacroAgent()
-onchain_agent = OnChainAgent()
-juno_advisor = JunoAdvisor()
+def start_fused_call(query: ResearchQuery, asset: str, market_data: Dict,
+                     modes: Dict[str, Optional[str]]) -> Optional[FusedCall]:
+    """Start one LLM call on behalf of every agent that would otherwise make its own.
+
+    Only worthwhile with two or more such agents. Per-session agent history is
+    kept per agent, so sessions with history keep separate calls.
+    """
+    enabled = query.fused if query.fused is not None else AGENT_FUSION
+    if not enabled or (agent_contexts.enabled and agent_context_key.get() is not None):
+        return None
+    participants = [
+        agent for agent in research_agents()
+        if agent.llm_schema is not None and agent.resolve_mode(modes[agent.name]) != "deterministic"
+    ]
+    if len(participants) < 2:
+        return None
+    task = asyncio.create_task(agents.get("fused").ask(asset, market_data, participants))
+    return FusedCall([agent.name.lower() for agent in participants], task)
+
+async def run_agent(agent: ResearchAgent, asset: str, market_data: Dict, deadline: float,
+                    mode: Optional[str] = None, fused: Optional[FusedCall] = None) -> AgentEvidence:
+    """Run one agent within its budget, converting timeouts and failures into evidence"""
+    # Each agent runs in its own task, so this only reaches this agent's calls
+    fused_call.set(fused)
+    budget = max(0.0, min(agent_timeout(agent.name), deadline - asyncio.get_running_loop().time()))
+    started = time.perf_counter()
+    try:
+        evidence = await asyncio.wait_for(agent.analyze(asset, market_data, mode), timeout=budget)
+    except asyncio.TimeoutError:
+        logging.warning(f"{agent.name} agent timed out after {budget:.1f}s")
+        evidence = AgentEvidence(
+            agent=agent.name,
+            score=0,
+            confidence=0,
+            highlights=[f"Timed out after {budget:.1f}s"],
+            sources=[],
+            status="timed_out"
+        )
+    except Exception as e:
+        logging.error(f"{agent.name} agent error: {e}")
+        evidence = AgentEvidence(
+            agent=agent.name,
+            score=0,
+            confidence=0,
+            highlights=[f"Error in {agent.name.lower()} analysis"],
+            sources=[],
+            status="error"
+        )
+    agent_analyze_seconds.labels(agent.name, evidence.status).observe(time.perf_counter() - started)
+    return evidence
+
+async def run_agents(query: ResearchQuery, asset: str, market_data: Dict,
+                     deadline: float) -> AsyncIterator[Tuple[int, AgentEvidence]]:
+    """Run all research agents in parallel, yielding (position, evidence) as each one finishes.
+
+    Every agent yields exactly one evidence item; agents that miss their budget
+    are cancelled and reported with status "timed_out".
+    """
+    modes = {agent.name: requested_mode(query, agent) for agent in research_agents()}
+    fused = start_fused_call(query, asset, market_data, modes)
+    tasks = [
+        asyncio.create_task(run_agent(agent, asset, market_data, deadline, modes[agent.name], fused))
+        for agent in research_agents()
+    ]
+    positions = {task: i for i, task in enumerate(tasks)}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=positions.get):
+                yield positions[task], task.result()
+    finally:
+        # Reached early when a streaming client disconnects
+        for task in pending:
+            task.cancel()
+        if fused is not None:
+            fused.cancel()
+
+def dropped_agents(evidence: List[AgentEvidence]) -> List[str]:
+    return [e.agent for e in evidence if e.status != "ok"]
+
+def build_market_view(asset: str, timeframe: str, evidence: List[AgentEvidence]) -> MarketView:
+    # Bias comes from the agents that actually contributed; conviction is
+    # scaled down by the share of agents that were dropped
+    contributing = [e for e in evidence if e.status == "ok"]
+    total_score = sum(e.score for e in contributing) / len(contributing) if contributing else 0
+    coverage = len(contributing) / len(evidence) if evidence else 0
+    bias = "bullish" if total_score > 0.2 else "bearish" if total_score < -0.2 else "neutral"
+
+    key_levels = {"support": [], "resistance": []}
+    for e in contributing:
+        for side, values in e.levels.items():
+            key_levels.setdefault(side, []).extend(values)
+    key_levels = {side: sorted(set(values)) for side, values in key_levels.items()}
+
+    risks = ["High volatility", "Regulatory uncertainty"]
+    dropped = dropped_agents(evidence)
+    if dropped:
+        risks.append(f"Partial analysis: {', '.join(dropped)} unavailable")
+
+    return MarketView(
+        asset=asset,
+        timeframe=timeframe,
+        bias=bias,
+        conviction=int(abs(total_score) * 50 * coverage),
+        key_levels=key_levels,
+        catalysts=["Market sentiment", "Technical levels"],
+        risks=risks
+    )
+
+def build_recommendations(query: ResearchQuery, market_data: Dict) -> List[Recommendation]:
+    return [
+        Recommendation(
+            type="idea",
+            entry_zone=f"Around ${market_data.get('usd', 0)}",
+            invalidation="Below recent support",
+            targets=["Next resistance level"],
+            r_r=2.0,
+            probability_win=0.6,
+            time_horizon=query.timeframe or "1d",
+            sizing_guidance="1-2% of portfolio",
+            fit_for_user="Aligned with growth objective"
+        )
+    ]
+
+def build_summary(market_view: MarketView, dropped: List[str]) -> str:
+    summary = f"Analysis for {market_view.asset}: {market_view.bias} bias with {market_view.conviction}% conviction based on multi-agent research."
+    if dropped:
+        summary += f" {', '.join(dropped)} did not report in time."
+    return summary
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
 # API Endpoints
 @api_router.get("/")
 async def root():
     return {"message": "Juno Research API"}
 
+def research_cache_key(query: ResearchQuery) -> Tuple:
+    """Queries that would produce the same research share a key; the free-text query does not matter.
+
+    The user profile is left out: no agent or recommendation reads it, and keeping
+    it would split the key so precomputed (profile-less) results never served
+    the users who follow an asset. Add it back once research depends on it.
+    """
+    modes = tuple(sorted((query.agent_modes or {}).items()))
+    session = agent_context_key.get() if agent_contexts.enabled else None
+    fused = query.fused if query.fused is not None else AGENT_FUSION
+    return ((query.asset or "BTC").upper(), query.timeframe or "1d", query.agent_mode, modes, fused, session)
+
+def research_flight_key(query: ResearchQuery) -> Tuple:
+    """Computations are only shared between queries with the same time budget, so a
+    short-deadline run that drops agents is never handed to a caller willing to wait"""
+    return (*research_cache_key(query), research_budget(query))
+
+def cached_research(query: ResearchQuery) -> Optional[ResearchResponse]:
+    cached = research_cache.get(research_cache_key(query))
+    return cached.model_copy(update={"cached": True}) if cached is not None else None
+
+def remember_research(query: ResearchQuery, response: ResearchResponse):
+    # Partial results (dropped agents) and results built on stale quotes are not
+    # served to other requests
+    if not response.agents_dropped and not response.market_data_stale:
+        research_cache.set(research_cache_key(query), response)
+
+async def market_data_within(fetch: Awaitable[Dict], deadline: float, what: str) -> Dict:
+    """Market data fetched by the research deadline, or {} once it has passed.
+
+    The fetch is shielded so it still completes in the background: its result
+    refreshes the price cache and the breaker still sees slow upstream calls.
+    """
+    try:
+        return await asyncio.wait_for(asyncio.shield(fetch), max(0.0, deadline - asyncio.get_running_loop().time()))
+    except asyncio.TimeoutError:
+        logging.warning(f"Market data for {what} missed the research deadline")
+        return {}
+
+async def compute_research(query: ResearchQuery, market_data: Optional[Dict] = None) -> ResearchResponse:
+    asset = query.asset or "BTC"
+    deadline = research_deadline(query)
+    
+    # Get market data unless the caller already fetched it
+    if market_data is None:
+        market_data = await market_data_within(crypto_service.get_price_data(asset), deadline, asset)
+    if not market_data:
+        raise MarketDataUnavailable(asset)
+    
+    # Run agents in parallel, keeping evidence in agent order
+    results = {}
+    async for position, result in run_agents(query, asset, market_data, deadline):
+        results[position] = result
+    evidence = [results[position] for position in sorted(results)]
+    dropped = dropped_agents(evidence)
+    
+    market_view = build_market_view(asset, query.timeframe or "1d", evidence)
+    
+    # Create final response
+    response = ResearchResponse(
+        summary=build_summary(market_view, dropped),
+        market_view=market_view,
+        recommendations=build_recommendations(query, market_data),
+        agent_evidence=evidence,
+        agents_dropped=dropped,
+        disclosures=RESEARCH_DISCLOSURES,
+        market_data_stale=bool(market_data.get("stale"))
+    )
+    remember_research(query, response)
+    return response
+
+async def precompute_research(asset: str):
+    """Warm the research cache for an asset under the default profile"""
+    query = ResearchQuery(query=f"precompute {asset}", asset=asset)
+    # Precompute yields the LLM to interactive requests
+    with priority(PRIORITY_BACKGROUND):
+        await research_flight.do(research_flight_key(query), lambda: compute_research(query))
+
+precompute_scheduler = PrecomputeScheduler(
+    precompute_research,
+    base_assets=[a.strip() for a in os.environ.get('PRECOMPUTE_ASSETS', 'BTC,ETH').split(',') if a.strip()],
+    interval=float(os.environ.get('PRECOMPUTE_INTERVAL', '45')),
+    concurrency=int(os.environ.get('PRECOMPUTE_CONCURRENCY', '2')),
+    jitter=float(os.environ.get('PRECOMPUTE_JITTER', '5')),
+    top_n=int(os.environ.get('PRECOMPUTE_TOP_N', '10')),
+    # Follows expire unless renewed by a request carrying the profile
+    follow_ttl=float(os.environ.get('PRECOMPUTE_FOLLOW_TTL', '3600')),
+    known=lambda asset: symbol_index.resolve(asset) is not None,
+)
+
 @api_router.post("/research", response_model=ResearchResponse)
-async def research_query(query: ResearchQuery):
+async def research_endpoint(query: ResearchQuery):
     """Main research endpoint that coordinates all agents"""
+    return FastJSONResponse(await research_query(query))
+
+async def research_query(query: ResearchQuery) -> ResearchResponse:
+    """Research from the cache, a concurrent identical computation or a fresh run"""
     try:
-        asset = query.asset or "BTC"
-        
-        # Get market data
-        market_data = await crypto_service.get_price_data(asset)
+        cached = cached_research(query)
+        precompute_scheduler.record_request(query.asset or "BTC", hit=cached is not None)
+        if query.user_profile:
+            precompute_scheduler.follow(query.user_profile.assets_followed)
+        if cached is not None:
+            return cached
+        # Concurrent identical queries share one computation
+        return await research_flight.do(research_flight_key(query), lambda: compute_research(query))
         
-        # Run agents in parallel
-        sentiment_task = sentiment_agent.analyze(asset, market_data)
-        technical_task = technical_agent.analyze(asset, market_data)
-        macro_task = macro_agent.analyze(asset, market_data)
-        onchain_task = onchain_agent.analyze(asset, market_data)
-        
-        agent_results = await asyncio.gather(
-            sentiment_task, technical_task, macro_task, onchain_task,
-            return_exceptions=True
-        )
-        
-        # Filter out exceptions and create evidence list
-        evidence = []
-        for result in agent_results:
-            if isinstance(result, AgentEvidence):
+    except MarketDataUnavailable:
+        raise HTTPException(status_code=503, detail="Market data unavailable")
+    except Exception as e:
+        logging.error(f"Research query error: {e}")
+        raise HTTPException(status_code=500, detail="Research analysis failed")
+
+def research_tail_events(response: ResearchResponse) -> List[str]:
+    return [
+        sse_event("market_view", response.market_view.model_dump(mode="json")),
+        sse_event("recommendations", [r.model_dump(mode="json") for r in response.recommendations]),
+        sse_event("summary", {
+            "id": response.id,
+            "summary": response.summary,
+            "agents_dropped": response.agents_dropped,
+            "disclosures": response.disclosures,
+            "cached": response.cached,
+            "market_data_stale": response.market_data_stale,
+            "computed_at": response.computed_at.isoformat(),
+            "created_at": response.created_at.isoformat()
+        }),
+    ]
+
+@api_router.post("/research/stream")
+async def research_stream(query: ResearchQuery):
+    """Streaming research over Server-Sent Events.
+
+    Emits one `evidence` event per agent as it finishes, then `market_view`,
+    `recommendations` and `summary` once all agents are done.
+    """
+    asset = query.asset or "BTC"
+
+    async def events():
+        try:
+            cached = cached_research(query)
+            if cached is not None:
+                for result in cached.agent_evidence:
+                    yield sse_event("evidence", result.model_dump(mode="json"))
+                for event in research_tail_events(cached):
+                    yield event
+                return
+
+            deadline = research_deadline(query)
+            market_data = await market_data_within(crypto_service.get_price_data(asset), deadline, asset)
+            if not market_data:
+                yield sse_event("error", {"detail": "Market data unavailable", "status": 503})
+                return
+
+            evidence = []
+            async for _, result in run_agents(query, asset, market_data, deadline):
                 evidence.append(result)
-        
-        # Calculate overall bias
-        total_score = sum(e.score for e in evidence) / len(evidence) if evidence else 0
-        bias = "bullish" if total_score > 0.2 else "bearish" if total_score < -0.2 else "neutral"
-        
-        # Create market view
-        market_view = MarketView(
-            asset=asset,
-            timeframe=query.timeframe or "1d",
-            bias=bias,
-            conviction=int(abs(total_score) * 50),
-            key_levels={"support": [], "resistance": []},
-            catalysts=["Market sentiment", "Technical levels"],
-            risks=["High volatility", "Regulatory uncertainty"]
-        )
-        
-        # Generate recommendations
-        recommendations = [
-            Recommendation(
-                type="idea",
-                entry_zone=f"Around ${market_data.get('usd', 0)}",
-                invalidation="Below recent support",
-                targets=["Next resistance level"],
-                r_r=2.0,
-                probability_win=0.6,
-                time_horizon=query.timeframe or "1d",
-                sizing_guidance="1-2% of portfolio",
-                fit_for_user="Aligned with growth objective"
+                yield sse_event("evidence", result.model_dump(mode="json"))
+
+            market_view = build_market_view(asset, query.timeframe or "1d", evidence)
+            dropped = dropped_agents(evidence)
+            response = ResearchResponse(
+                summary=build_summary(market_view, dropped),
+                market_view=market_view,
+                recommendations=build_recommendations(query, market_data),
+                agent_evidence=evidence,
+                agents_dropped=dropped,
+                disclosures=RESEARCH_DISCLOSURES,
+                market_data_stale=bool(market_data.get("stale"))
             )
-        ]
-        
-        # Create final response
-        response = ResearchResponse(
-            summary=f"Analysis for {asset}: {bias} bias with {int(abs(total_score) * 50)}% conviction based on multi-agent research.",
-            market_view=market_view,
-            recommendations=recommendations,
-            agent_evidence=evidence,
-            disclosures=[
-                "This is research, not financial advice.",
-                "Crypto markets are highly volatile and risky.",
-                "Past performance does not guarantee future results."
-            ]
+            remember_research(query, response)
+            for event in research_tail_events(response):
+                yield event
+        except Exception as e:
+            logging.error(f"Research stream error: {e}")
+            yield sse_event("error", {"detail": "Research analysis failed"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Global limit on concurrent asset analyses from batch requests
+research_batch_slots = asyncio.Semaphore(RESEARCH_BATCH_CONCURRENCY)
+
+def batch_assets(batch: BatchResearchQuery) -> List[str]:
+    assets = list(dict.fromkeys(a.strip().upper() for a in batch.assets if a.strip()))
+    if not assets:
+        raise HTTPException(status_code=400, detail="No assets requested")
+    if len(assets) > RESEARCH_BATCH_MAX_ASSETS:
+        raise HTTPException(status_code=400, detail=f"At most {RESEARCH_BATCH_MAX_ASSETS} assets per request")
+    return assets
+
+async def run_batch(batch: BatchResearchQuery, assets: List[str]) -> AsyncIterator[BatchResearchItem]:
+    """Research several assets, yielding one item per asset as it completes.
+
+    Cached results are returned first; market data for the rest is fetched in
+    one batched upstream call. A failing asset yields an error item instead of
+    failing the batch.
+    """
+    fields = batch.dict(exclude={"assets"})
+    queries = {asset: ResearchQuery(**fields, asset=asset) for asset in assets}
+    if batch.user_profile:
+        precompute_scheduler.follow(batch.user_profile.assets_followed)
+
+    pending_assets = []
+    for asset, query in queries.items():
+        cached = cached_research(query)
+        precompute_scheduler.record_request(asset, hit=cached is not None)
+        if cached is not None:
+            yield BatchResearchItem(asset=asset, research=cached)
+        else:
+            pending_assets.append(asset)
+    if not pending_assets:
+        return
+
+    try:
+        # Every asset shares the batch's per-asset deadline, so one budget bounds the fetch
+        market = await market_data_within(
+            crypto_service.get_price_data_many(pending_assets),
+            research_deadline(queries[pending_assets[0]]), f"{len(pending_assets)} assets"
         )
-        
-        return response
-        
     except Exception as e:
-        logging.error(f"Research query error: {e}")
-        raise HTTPException(status_code=500, detail="Research analysis failed")
+        logging.error(f"Batch market data fetch failed: {e}")
+        market = {}
+
+    async def research_one(asset: str) -> BatchResearchItem:
+        query = queries[asset]
+        try:
+            async with research_batch_slots:
+                research = await research_flight.do(
+                    research_flight_key(query), lambda: compute_research(query, market.get(asset, {}))
+                )
+            return BatchResearchItem(asset=asset, research=research)
+        except MarketDataUnavailable:
+            return BatchResearchItem(asset=asset, status="error", error="Market data unavailable")
+        except Exception as e:
+            logging.error(f"Batch research failed for {asset}: {e}")
+            return BatchResearchItem(asset=asset, status="error", error="Research analysis failed")
+
+    tasks = [asyncio.create_task(research_one(asset)) for asset in pending_assets]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Reached early when a streaming client disconnects
+        for task in tasks:
+            task.cancel()
+
+@api_router.post("/research/batch", response_model=BatchResearchResponse)
+async def research_batch(batch: BatchResearchQuery):
+    """Research for many assets in one request; per-asset failures are reported, not raised"""
+    assets = batch_assets(batch)
+    items = {item.asset: item async for item in run_batch(batch, assets)}
+    results = [items[asset] for asset in assets]
+    failed = sum(1 for item in results if item.status != "ok")
+    return FastJSONResponse(BatchResearchResponse(results=results, succeeded=len(results) - failed, failed=failed))
+
+@api_router.post("/research/batch/stream")
+async def research_batch_stream(batch: BatchResearchQuery):
+    """Batch research over Server-Sent Events: one `result` event per asset as it
+    completes, then a `done` event with the counts."""
+    assets = batch_assets(batch)
+
+    async def events():
+        succeeded = failed = 0
+        async for item in run_batch(batch, assets):
+            if item.status == "ok":
+                succeeded += 1
+            else:
+                failed += 1
+            yield sse_event("result", item.model_dump(mode="json"))
+        yield sse_event("done", {"succeeded": succeeded, "failed": failed})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @api_router.post("/chat")
 async def chat_endpoint(message: dict):
@@ -367,41 +1406,219 @@ async def chat_endpoint(message: dict):
         user_message = message.get("message", "")
         session_id = message.get("session_id") or str(uuid.uuid4())
         
-        # Simple query parsing - look for asset mentions
-        asset = "BTC"
-        for symbol in ["BTC", "ETH", "SOL", "ADA", "DOT"]:
-            if symbol.lower() in user_message.lower():
-                asset = symbol
-                break
+        # Every asset mentioned in the message; research runs on the first one
+        assets = [coin.symbol for coin in symbol_index.find(user_message)]
+        asset = assets[0] if assets else "BTC"
         
         # Create research query
         query = ResearchQuery(query=user_message, asset=asset)
-        research_result = await research_query(query)
+        with agent_context(session_id):
+            research_result = await research_query(query)
         
-        # Store chat message
+        # Store the research once and reference it from the chat message
         chat_msg = ChatMessage(
             session_id=session_id,
             user_id="anonymous",
             message=user_message,
-            response=research_result
+            research_id=research_result.id
         )
         
-        await db.chat_messages.insert_one(chat_msg.dict())
+        await research_writer.put(research_document(research_result), key=session_id)
+        await chat_writer.put(chat_msg.dict(exclude={"response"}), key=session_id)
         
-        return {
+        return FastJSONResponse({
             "response": research_result,
-            "session_id": session_id
-        }
+            "session_id": session_id,
+            "assets": assets
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Chat endpoint error: {e}")
         raise HTTPException(status_code=500, detail="Chat processing failed")
 
-@api_router.get("/chat/history/{session_id}")
-async def get_chat_history(session_id: str):
-    """Get chat history for a session"""
-    messages = await db.chat_messages.find({"session_id": session_id}).to_list(100)
-    return [ChatMessage(**msg) for msg in messages]
+def research_document(research: ResearchResponse) -> Dict[str, Any]:
+    """Research as stored in research_results; the shared disclosures are re-attached on read"""
+    return research.dict(exclude={"disclosures", "cached"})
+
+def stored_research(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """A research document as the API serves it, with defaults for fields older documents lack"""
+    research = dict(doc)
+    research.setdefault("agents_dropped", [])
+    research.setdefault("cached", False)
+    research.setdefault("market_data_stale", False)
+    research.setdefault("computed_at", research.get("created_at"))
+    research["agent_evidence"] = [{"levels": {}, "status": "ok", **e} for e in research.get("agent_evidence", [])]
+    return research
+
+def stored_chat_message(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """A chat_messages document as the API serves it.
+
+    Documents were validated as ChatMessage when written, so reads only fill
+    in defaults instead of rebuilding the models.
+    """
+    msg = dict(doc)
+    msg.setdefault("research_id", None)
+    msg.setdefault("response", None)
+    if msg["response"] is not None:
+        msg["response"] = stored_research(msg["response"])
+    return msg
+
+async def resolve_research(messages: List[Dict[str, Any]]):
+    """Attach referenced research to chat messages with one batched $in query"""
+    ids = list({msg["research_id"] for msg in messages if msg.get("research_id") and not msg.get("response")})
+    if not ids:
+        return
+    docs = await db.research_results.find({"id": {"$in": ids}}, {"_id": 0}).to_list(len(ids))
+    by_id = {doc["id"]: doc for doc in docs}
+    for msg in messages:
+        doc = by_id.get(msg.get("research_id"))
+        if doc is not None and not msg.get("response"):
+            msg["response"] = {**doc, "disclosures": RESEARCH_DISCLOSURES}
+
+def encode_history_cursor(msg: Dict[str, Any]) -> str:
+    return f"{msg['created_at'].isoformat()}|{msg['id']}"
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, msg_id = cursor.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), msg_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
+
+@api_router.get("/chat/history/{session_id}", response_model=List[ChatMessage])
+async def get_chat_history(session_id: str, before: Optional[str] = None,
+                           limit: int = CHAT_HISTORY_MAX_LIMIT, summary: bool = False):
+    """Get chat history for a session.
+
+    Returns the newest `limit` messages older than the `before` cursor, oldest
+    first. When more messages exist, the cursor for the next page is sent in
+    the X-Next-Cursor header. `summary=true` omits the embedded research.
+    """
+    limit = max(1, min(limit, CHAT_HISTORY_MAX_LIMIT))
+    # Make this session's messages still sitting in the write-behind queues visible to this read
+    await research_writer.flush(session_id)
+    await chat_writer.flush(session_id)
+    criteria: Dict[str, Any] = {"session_id": session_id}
+    if before:
+        # Keyset pagination on (created_at, id) served by the chat_messages index
+        created_at, msg_id = decode_history_cursor(before)
+        criteria["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": msg_id}},
+        ]
+    projection = {"_id": 0, "response": 0} if summary else {"_id": 0}
+
+    messages = await db.chat_messages.find(criteria, projection) \
+        .sort([("created_at", -1), ("id", -1)]) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+    headers = {}
+    if len(messages) > limit:
+        messages = messages[:limit]
+        headers["X-Next-Cursor"] = encode_history_cursor(messages[-1])
+    messages.reverse()
+    if not summary:
+        await resolve_research(messages)
+    return FastJSONResponse([stored_chat_message(msg) for msg in messages], headers=headers)
+
+@api_router.get("/stats")
+async def get_stats():
+    """Cache and pipeline statistics for tuning"""
+    return {
+        "price_cache": crypto_service.cache_stats(),
+        "llm_cache": llm_cache.stats(),
+        "llm_dispatch": llm_dispatcher.stats(),
+        "candles": candle_store.stats(),
+        "chat_writer": chat_writer.stats(),
+        "research_writer": research_writer.stats(),
+        "research_cache": {**research_cache.stats(), **research_flight.stats()},
+        "scheduler": precompute_scheduler.stats(),
+        "price_hub": price_hub.stats(),
+        "symbol_index": symbol_index.stats(),
+        "agent_contexts": agent_contexts.stats(),
+        "coingecko": crypto_service.upstream_stats(),
+        "compression": {"minimum_size": COMPRESSION_MIN_SIZE, **compression_stats.as_dict()},
+    }
+
+write_behind_pending = Gauge("juno_write_behind_pending", "Documents accepted but not yet written", ["queue"])
+write_behind_pending.labels("chat").set_function(lambda: chat_writer.pending)
+write_behind_pending.labels("research").set_function(lambda: research_writer.pending)
+llm_active_calls = Gauge("juno_llm_active_calls", "LLM calls currently in flight")
+llm_active_calls.set_function(lambda: llm_dispatcher.active)
+price_hub_connections = Gauge("juno_price_hub_connections", "Connected price WebSocket clients")
+price_hub_connections.set_function(lambda: price_hub.connections)
+
+@api_router.get("/startup")
+async def get_startup_report():
+    """Where this worker's startup time went: imports, lazy initializations and startup steps (ms)"""
+    return {**startup_report.as_dict(), "agents": agents.stats(), "mongo_client_built": client.built}
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of the in-process metrics registry"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@api_router.get("/market")
+async def get_market_data_many(assets: str = "BTC,ETH"):
+    """Get current market data for a comma-separated list of assets in one upstream call"""
+    symbols = [a.strip().upper() for a in assets.split(",") if a.strip()]
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No assets requested")
+    if len(symbols) > MARKET_BATCH_MAX_ASSETS:
+        raise HTTPException(status_code=400, detail=f"At most {MARKET_BATCH_MAX_ASSETS} assets per request")
+    return await crypto_service.get_price_data_many(symbols)
+
+@api_router.websocket("/ws/prices")
+async def prices_websocket(websocket: WebSocket):
+    """Live prices. Clients send {"action": "subscribe"|"unsubscribe", "assets": [...]} and
+    receive a `snapshot` per asset followed by `update` messages with only the changed fields
+    (fields dropped from the quote, such as `stale` once upstream recovers, are sent as null)."""
+    await websocket.accept()
+    sub = price_hub.connect()
+
+    async def pump():
+        while True:
+            message = await sub.queue.get()
+            if message is None:
+                # Dropped as a slow consumer
+                await websocket.close(code=1013)
+                return
+            await websocket.send_json(message)
+
+    sender = asyncio.create_task(pump())
+    try:
+        while True:
+            request = await websocket.receive_json()
+            if not isinstance(request, dict):
+                request = {}
+            action = request.get("action")
+            assets = request.get("assets") if isinstance(request.get("assets"), list) else []
+            if action == "subscribe":
+                added = price_hub.subscribe(sub, assets)
+                rejected = sorted({str(a).strip().upper() for a in assets if str(a).strip()} - sub.assets)
+                await websocket.send_json({"type": "subscribed", "assets": sorted(sub.assets), "added": added,
+                                           "rejected": rejected})
+            elif action == "unsubscribe":
+                price_hub.unsubscribe(sub, assets)
+                await websocket.send_json({"type": "subscribed", "assets": sorted(sub.assets), "added": [],
+                                           "rejected": []})
+            else:
+                await websocket.send_json({"type": "error", "detail": "Unknown action"})
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    except Exception as e:
+        logging.error(f"Price websocket error: {e}")
+    finally:
+        sender.cancel()
+        price_hub.disconnect(sub)
+        try:
+            await sender
+        except (asyncio.CancelledError, WebSocketDisconnect, RuntimeError):
+            pass
+        except Exception as e:
+            logging.error(f"Price websocket send failed: {e}")
 
 @api_router.get("/market/{asset}")
 async def get_market_data(asset: str):
@@ -412,12 +1629,24 @@ async def get_market_data(asset: str):
 # Include the router in the main app
 app.include_router(api_router)
 
+compression_stats = CompressionStats()
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    gzip_level=COMPRESSION_GZIP_LEVEL,
+    brotli_quality=COMPRESSION_BROTLI_QUALITY,
+    stats=compression_stats,
+)
+
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Configure logging
@@ -427,6 +1656,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def ensure_chat_indexes():
+    try:
+        await db.chat_messages.create_index([("session_id", 1), ("created_at", -1), ("id", -1)])
+        await db.research_results.create_index("id", unique=True)
+    except Exception as e:
+        logging.error(f"Chat index creation failed: {e}")
+
+@app.on_event("startup")
+async def startup_http_client():
+    with startup_report.measure("startup", "symbol_index"):
+        symbol_index.build()
+    with startup_report.measure("startup", "http_client"):
+        await http_client.start()
+    with startup_report.measure("startup", "mongo_indexes"):
+        await llm_cache.ensure_indexes()
+        await candle_store.ensure_collection()
+        await ensure_chat_indexes()
+    if os.environ.get('AGENT_WARMUP', 'false').lower() == 'true':
+        with startup_report.measure("startup", "agent_warmup"):
+            agents.warm()
+            llm_sdk()
+    research_writer.start()
+    chat_writer.start()
+    if os.environ.get('PRECOMPUTE_ENABLED', 'true').lower() == 'true':
+        precompute_scheduler.start()
+    if CANDLE_BACKFILL_EVERY > 0:
+        candle_store.start_backfill(CANDLE_BACKFILL_ASSETS, CANDLE_BACKFILL_INTERVALS, CANDLE_BACKFILL_EVERY)
+    startup_report.ready()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await price_hub.stop()
+    await precompute_scheduler.stop()
+    await candle_store.stop()
+    await research_writer.stop()
+    await chat_writer.stop()
+    await http_client.close()
+    client.close()
+
+startup_report.module_imported()
@@ -0,0 +1,239 @@
+"""Symbol and alias index for finding asset mentions in free text.
+
+The index is built from a bundled CoinGecko coin-list snapshot
+(data/coin_list.json). Every ticker, name and alias is compiled into one
+Aho-Corasick automaton, so a message is scanned once regardless of how many
+coins are known. A match only counts at word boundaries. Tickers that are
+also ordinary words ("near", "one", "hot") or that have one or two letters
+only count when they are written in capitals or prefixed with `$`.
+
+Refresh the snapshot from CoinGecko (from backend/):
+    python symbol_index.py --refresh --pages 8
+"""
+import argparse
+import json
+import logging
+import urllib.request
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+COIN_LIST_PATH = Path(__file__).parent / "data" / "coin_list.json"
+
+COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+
+# Tickers and names that read as ordinary English words in a chat message
+COMMON_WORDS = frozenset({
+    "a", "ai", "all", "alt", "amp", "an", "and", "any", "ape", "are", "at", "audio", "band",
+    "bat", "be", "beam", "big", "blur", "bonk", "book", "but", "buy", "can", "cat", "civic",
+    "comp", "compound", "cost", "dash", "day", "dog", "earn", "eat", "fast", "flow", "for",
+    "fun", "gas", "get", "go", "gods", "gold", "good", "harmony", "helium", "hive", "hold",
+    "hot", "how", "i", "in", "is", "it", "just", "key", "kind", "like", "link", "long", "magic",
+    "maker", "mask", "me", "meme", "moon", "more", "my", "nano", "near", "new", "no", "not",
+    "now", "ocean", "of", "on", "one", "or", "orca", "out", "pay", "power", "real", "render",
+    "request", "rose", "run", "safe", "sand", "sell", "short", "so", "status", "stellar",
+    "super", "sushi", "sweat", "the", "to", "top", "trust", "up", "us", "usd", "waves", "wax",
+    "we", "what", "why", "win", "with", "you",
+})
+
+
+@dataclass(frozen=True)
+class Coin:
+    id: str
+    symbol: str
+    name: str
+    rank: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Mention:
+    coin: Coin
+    start: int
+    end: int
+
+
+class SymbolIndex:
+    """Resolves tickers, names and aliases to coins and finds every coin mentioned in a text"""
+
+    def __init__(self, path: Path = COIN_LIST_PATH):
+        self.path = path
+        self._built = False
+        self._lookup: Dict[str, Coin] = {}
+        self._patterns: List[Tuple[str, Coin, bool]] = []  # (text, coin, strict)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self.coins = 0
+
+    def build(self, coins: Optional[Iterable[Dict[str, Any]]] = None):
+        """Compile the automaton from coin-list entries (the bundled snapshot by default)"""
+        if coins is None:
+            with open(self.path) as f:
+                coins = json.load(f)
+        # Best-ranked coin wins when several share a ticker or name
+        entries = sorted(coins, key=lambda c: c.get("market_cap_rank") or float("inf"))
+
+        lookup: Dict[str, Coin] = {}
+        patterns: Dict[str, Tuple[Coin, bool]] = {}
+        for entry in entries:
+            coin = Coin(entry["id"], entry["symbol"].upper(), entry["name"], entry.get("market_cap_rank"))
+            lookup.setdefault(coin.id, coin)
+            symbol = entry["symbol"].lower()
+            terms = [(symbol, len(symbol) <= 2 or symbol in COMMON_WORDS)]
+            for term in [entry["name"], *entry.get("aliases", [])]:
+                term = term.lower()
+                terms.append((term, term in COMMON_WORDS))
+            for term, strict in terms:
+                if not term:
+                    continue
+                lookup.setdefault(term, coin)
+                if term not in patterns:
+                    patterns[term] = (coin, strict)
+                elif strict and patterns[term][0] is coin:
+                    patterns[term] = (coin, True)
+
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        pattern_list = []
+        for term, (coin, strict) in patterns.items():
+            node = 0
+            for ch in term:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append(len(pattern_list))
+            pattern_list.append((term, coin, strict))
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                if node:
+                    f = fail[node]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    fail[child] = goto[f].get(ch, 0)
+                out[child] = out[child] + out[fail[child]]
+
+        self._lookup = lookup
+        self._patterns = pattern_list
+        self._goto, self._fail, self._out = goto, fail, out
+        self.coins = len(entries)
+        self._built = True
+        logging.info(f"Symbol index built: {self.coins} coins, {len(pattern_list)} patterns")
+
+    def _ensure_built(self):
+        if not self._built:
+            self.build()
+
+    def resolve(self, term: str) -> Optional[Coin]:
+        """Coin for an exact ticker, name, alias or CoinGecko id (case-insensitive)"""
+        self._ensure_built()
+        return self._lookup.get(term.strip().lstrip("$").lower())
+
+    def coin_id(self, symbol: str) -> str:
+        """CoinGecko id for a ticker, falling back to the lowercased input"""
+        coin = self.resolve(symbol)
+        return coin.id if coin else symbol.lower()
+
+    def mentions(self, text: str) -> List[Mention]:
+        """All non-overlapping coin mentions in text, longest match first at each position"""
+        self._ensure_built()
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lowercase to more than one; keep offsets aligned with text
+            lowered = "".join(ch.lower()[:1] for ch in text)
+
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+        candidates: List[Tuple[int, int, int]] = []
+        node = 0
+        for i, ch in enumerate(lowered):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern_id in out[node]:
+                start = i - len(patterns[pattern_id][0]) + 1
+                candidates.append((start, i + 1, pattern_id))
+
+        n = len(text)
+        found: List[Mention] = []
+        last_end = 0
+        for start, end, pattern_id in sorted(candidates, key=lambda c: (c[0], -c[1])):
+            if start < last_end:
+                continue
+            if (start > 0 and _is_word_char(text[start - 1])) or (end < n and _is_word_char(text[end])):
+                continue
+            _, coin, strict = patterns[pattern_id]
+            dollar = start > 0 and text[start - 1] == "$"
+            if strict and not dollar and not text[start:end].isupper():
+                continue
+            found.append(Mention(coin, start, end))
+            last_end = end
+        return found
+
+    def find(self, text: str) -> List[Coin]:
+        """Distinct coins mentioned in text, in order of first mention"""
+        seen: Dict[str, Coin] = {}
+        for mention in self.mentions(text):
+            seen.setdefault(mention.coin.id, mention.coin)
+        return list(seen.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "built": self._built,
+            "coins": self.coins,
+            "patterns": len(self._patterns),
+            "nodes": len(self._goto) if self._built else 0,
+        }
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def refresh_snapshot(path: Path = COIN_LIST_PATH, pages: int = 8, per_page: int = 250):
+    """Rewrite the snapshot from CoinGecko /coins/markets, keeping curated aliases"""
+    aliases: Dict[str, List[str]] = {}
+    if path.exists():
+        with open(path) as f:
+            aliases = {c["id"]: c["aliases"] for c in json.load(f) if c.get("aliases")}
+
+    coins: List[Dict[str, Any]] = []
+    for page in range(1, pages + 1):
+        url = (f"{COINGECKO_MARKETS_URL}?vs_currency=usd&order=market_cap_desc"
+               f"&per_page={per_page}&page={page}")
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            rows = json.load(resp)
+        if not rows:
+            break
+        for row in rows:
+            entry = {"id": row["id"], "symbol": row["symbol"], "name": row["name"],
+                     "market_cap_rank": row.get("market_cap_rank")}
+            if row["id"] in aliases:
+                entry["aliases"] = aliases[row["id"]]
+            coins.append(entry)
+
+    with open(path, "w") as f:
+        f.write("[\n" + ",\n".join(json.dumps(c) for c in coins) + "\n]\n")
+    print(f"Wrote {len(coins)} coins to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--refresh", action="store_true", help="download a fresh snapshot from CoinGecko")
+    parser.add_argument("--pages", type=int, default=8, help="pages of 250 coins to download")
+    parser.add_argument("text", nargs="*", help="text to scan for coin mentions")
+    args = parser.parse_args()
+    if args.refresh:
+        refresh_snapshot(pages=args.pages)
+    if args.text:
+        index = SymbolIndex()
+        for coin in index.find(" ".join(args.text)):
+            print(f"{coin.symbol}\t{coin.id}\t{coin.name}")
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class WriteBehindQueue:
+    """Accepts documents on the request path and persists them with insert_many in the background.
+
+    A batch is flushed when it reaches max_batch documents or flush_interval
+    seconds after its first document, whichever comes first. put() waits for
+    space when the queue is full (backpressure); after put_timeout seconds it
+    gives up waiting and writes the document inline so nothing is dropped.
+
+    Every document gets a sequence number when put() is called. flush() waits
+    only for the documents numbered before it was called (or for the last one
+    put under a key), never for documents that keep arriving after it.
+    """
+
+    def __init__(
+        self,
+        collection: Callable[[], Any],
+        name: str,
+        max_batch: int = 100,
+        flush_interval: float = 0.5,
+        max_queue: int = 10000,
+        put_timeout: float = 2.0,
+    ):
+        self._collection = collection
+        self.name = name
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._flush_now = asyncio.Event()
+        self._progress = asyncio.Event()  # set and replaced whenever documents finish
+        self._seq = 0
+        # Sequence numbers accepted but not yet written, oldest first
+        self._unwritten: "OrderedDict[int, None]" = OrderedDict()
+        self._last_by_key: Dict[Hashable, int] = {}
+        self.flushes = 0
+        self.documents_written = 0
+        self.documents_failed = 0
+        self.duplicates = 0
+        self.inline_writes = 0
+        self.backpressure_waits = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._unwritten)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, doc: Dict[str, Any], key: Optional[Hashable] = None):
+        """Queue doc; key (e.g. a session id) lets flush(key) wait for that key's documents only"""
+        self.start()
+        self._seq += 1
+        entry = (self._seq, key, doc)
+        self._unwritten[self._seq] = None
+        if key is not None:
+            self._last_by_key[key] = self._seq
+        try:
+            self._queue.put_nowait(entry)
+            return
+        except asyncio.QueueFull:
+            self.backpressure_waits += 1
+        try:
+            await asyncio.wait_for(self._queue.put(entry), timeout=self.put_timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"{self.name} write-behind queue full, writing inline")
+            self.inline_writes += 1
+            try:
+                await self._collection().insert_one(doc)
+                self.documents_written += 1
+            except DuplicateKeyError:
+                # Same as in _write: shared research is stored once per id
+                self.duplicates += 1
+            finally:
+                self._finished([entry])
+        except BaseException:
+            # Never queued (e.g. the request was cancelled); do not leave flush() waiting for it
+            self._finished([entry])
+            raise
+
+    def _finished(self, entries: List[Tuple[int, Optional[Hashable], Dict[str, Any]]]):
+        for seq, key, _ in entries:
+            self._unwritten.pop(seq, None)
+            if key is not None and self._last_by_key.get(key) == seq:
+                del self._last_by_key[key]
+        self._progress.set()
+        self._progress = asyncio.Event()
+
+    async def flush(self, key: Optional[Hashable] = None):
+        """Wait until the documents put so far (only those under key, if given) have been written"""
+        target = self._seq if key is None else self._last_by_key.get(key)
+        while target is not None and self._unwritten and next(iter(self._unwritten)) <= target:
+            self.start()
+            self._flush_now.set()
+            await self._progress.wait()
+
+    async def stop(self):
+        """Drain the queue and stop the background flusher"""
+        if self._task is None:
+            return
+        await self.flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[int, Optional[Hashable], Dict[str, Any]]] = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0 or self._flush_now.is_set():
+                    break
+                # Wait for the next document, the batch deadline or an explicit flush()
+                getter = asyncio.ensure_future(self._queue.get())
+                flush_requested = asyncio.ensure_future(self._flush_now.wait())
+                done, _ = await asyncio.wait(
+                    {getter, flush_requested}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                flush_requested.cancel()
+                if getter in done:
+                    batch.append(getter.result())
+                    continue
+                getter.cancel()
+                break
+            self._flush_now.clear()
+            await self._write(batch)
+
+    async def _write(self, batch: List[Tuple[int, Optional[Hashable], Dict[str, Any]]]):
+        try:
+            await self._collection().insert_many([doc for _, _, doc in batch], ordered=False)
+            self.documents_written += len(batch)
+        except BulkWriteError as e:
+            # Unordered inserts keep going past individual failures; documents that
+            # already exist under a unique index are not an error
+            errors = e.details.get("writeErrors", [])
+            duplicates = sum(1 for err in errors if err.get("code") == DUPLICATE_KEY_ERROR)
+            self.documents_written += e.details.get("nInserted", 0)
+            self.duplicates += duplicates
+            self.documents_failed += len(errors) - duplicates
+            if len(errors) > duplicates:
+                logging.error(f"{self.name} write-behind flush partially failed: {len(errors) - duplicates} documents")
+        except Exception as e:
+            logging.error(f"{self.name} write-behind flush failed: {e}")
+            self.documents_failed += len(batch)
+        finally:
+            self._finished(batch)
+            self.flushes += 1
+            self.last_batch_size = len(batch)
+            self.max_batch_size = max(self.max_batch_size, len(batch))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "pending": len(self._unwritten),
+            "queue_capacity": self._queue.maxsize,
+            "flushes": self.flushes,
+            "documents_written": self.documents_written,
+            "documents_failed": self.documents_failed,
+            "duplicates": self.duplicates,
+            "avg_batch_size": round((self.documents_written + self.documents_failed + self.duplicates) / self.flushes, 2) if self.flushes else 0.0,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "backpressure_waits": self.backpressure_waits,
+            "inline_writes": self.inline_writes,
+        }
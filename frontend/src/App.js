@@ -1013,11 +1013,12 @@ const ChatApp = () => {
 
   const fetchMarketData = async () => {
     try {
-      const btcResponse = await axios.get(`${API}/market/BTC`);
-      const ethResponse = await axios.get(`${API}/market/ETH`);
+      const response = await axios.get(`${API}/market`, {
+        params: { assets: 'BTC,ETH' }
+      });
       setMarketData({
-        BTC: btcResponse.data,
-        ETH: ethResponse.data
+        BTC: response.data.BTC,
+        ETH: response.data.ETH
       });
     } catch (error) {
       console.error('Market data fetch error:', error);
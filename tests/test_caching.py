@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from caching import SingleFlight
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_do_coalesces_concurrent_calls():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+        return results, calls, flight
+
+    results, calls, flight = run(scenario())
+    assert results == ["value"] * 5
+    assert calls == 1
+    assert flight.coalesced == 4
+    assert len(flight) == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def scenario():
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "value"
+
+        leader = asyncio.create_task(flight.do("k", fetch))
+        await started.wait()
+        follower = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert run(scenario()) == "value"
+
+
+def test_leader_timeout_does_not_reach_followers():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "value"
+
+        leader = asyncio.create_task(asyncio.wait_for(flight.do("k", fetch), timeout=0.01))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", fetch))
+        with pytest.raises(asyncio.TimeoutError):
+            await leader
+        return await follower
+
+    assert run(scenario()) == "value"
+
+
+def test_call_is_cancelled_when_last_waiter_leaves():
+    async def scenario():
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.create_task(flight.do("k", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        waiters[0].cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set()
+        waiters[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert len(flight) == 0
+
+        async def fresh():
+            return "fresh"
+
+        # A new caller starts a new call rather than joining the cancelled one
+        return await flight.do("k", fresh)
+
+    assert run(scenario()) == "fresh"
+
+
+def test_exception_reaches_every_waiter_and_clears_key():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        results = await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+
+        async def ok():
+            return "ok"
+
+        return results, await flight.do("k", ok)
+
+    results, retry = run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert retry == "ok"
+
+
+def test_do_many_shares_keys_across_callers():
+    async def scenario():
+        flight = SingleFlight()
+        requested = []
+
+        async def fetch(keys):
+            requested.append(sorted(keys))
+            await asyncio.sleep(0.01)
+            return {key: key.upper() for key in keys if key != "missing"}
+
+        first = asyncio.create_task(flight.do_many(["a", "b"], fetch))
+        await asyncio.sleep(0)
+        second = await flight.do_many(["b", "c", "missing"], fetch)
+        return await first, second, requested
+
+    first, second, requested = run(scenario())
+    assert first == {"a": "A", "b": "B"}
+    assert second == {"b": "B", "c": "C", "missing": None}
+    assert requested == [["a", "b"], ["c", "missing"]]
+
+
+def test_do_many_cancelled_leader_does_not_cancel_followers():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fetch(keys):
+            await asyncio.sleep(0.05)
+            return {key: key.upper() for key in keys}
+
+        leader = asyncio.create_task(flight.do_many(["a", "b"], fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do_many(["b"], fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert run(scenario()) == {"b": "B"}
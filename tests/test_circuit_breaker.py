@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def ok():
+    return "ok"
+
+
+async def fail():
+    raise ValueError("upstream error")
+
+
+async def fail_times(breaker, n):
+    for _ in range(n):
+        with pytest.raises(ValueError):
+            await breaker.call(fail)
+
+
+def breaker(clock, name, **kwargs):
+    return CircuitBreaker(name, failure_threshold=3, reset_timeout=30, clock=clock, **kwargs)
+
+
+def test_opens_after_consecutive_failures_and_rejects():
+    async def scenario():
+        clock = Clock()
+        b = breaker(clock, "test-open")
+        await fail_times(b, 2)
+        assert await b.call(ok) == "ok"  # a success resets the streak
+        await fail_times(b, 2)
+        assert b.state == CLOSED
+        await fail_times(b, 1)
+        assert b.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            await b.call(ok)
+        clock.now = 10
+        assert b.retry_after() == pytest.approx(20)
+        return b.stats()
+
+    stats = run(scenario())
+    assert stats["rejected"] == 1
+    assert stats["opened"] == 1
+
+
+def test_half_open_probe_success_closes():
+    async def scenario():
+        clock = Clock()
+        b = breaker(clock, "test-probe-ok")
+        await fail_times(b, 3)
+        clock.now = 30
+        assert b.state == HALF_OPEN
+        assert await b.call(ok) == "ok"
+        return b.state
+
+    assert run(scenario()) == CLOSED
+
+
+def test_half_open_probe_failure_reopens_for_another_period():
+    async def scenario():
+        clock = Clock()
+        b = breaker(clock, "test-probe-fail")
+        await fail_times(b, 3)
+        clock.now = 30
+        await fail_times(b, 1)
+        assert b.state == OPEN
+        clock.now = 59
+        assert b.state == OPEN
+        clock.now = 60
+        return b.state
+
+    assert run(scenario()) == HALF_OPEN
+
+
+def test_half_open_admits_limited_probes():
+    async def scenario():
+        clock = Clock()
+        b = breaker(clock, "test-probe-limit")
+        await fail_times(b, 3)
+        clock.now = 30
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "ok"
+
+        probe = asyncio.create_task(b.call(slow))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await b.call(ok)
+        release.set()
+        return await probe, b.state
+
+    assert run(scenario()) == ("ok", CLOSED)
+
+
+def test_cancelled_probe_releases_its_slot():
+    async def scenario():
+        clock = Clock()
+        b = breaker(clock, "test-probe-cancel")
+        await fail_times(b, 3)
+        clock.now = 30
+        probe = asyncio.create_task(b.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        assert b.state == HALF_OPEN
+        # The cancellation counted neither as success nor as failure; another probe may go
+        return await b.call(ok), b.state, b.failures
+
+    assert run(scenario()) == ("ok", CLOSED, 3)
+
+
+def test_failures_while_open_do_not_extend_the_open_period():
+    async def scenario():
+        clock = Clock()
+        b = breaker(clock, "test-late-failure")
+        release = asyncio.Event()
+
+        async def late_fail():
+            await release.wait()
+            raise ValueError("late")
+
+        # Started while closed, fails only after the circuit has opened
+        straggler = asyncio.create_task(b.call(late_fail))
+        await asyncio.sleep(0)
+        await fail_times(b, 3)
+        assert b.state == OPEN
+        clock.now = 20
+        release.set()
+        with pytest.raises(ValueError):
+            await straggler
+        clock.now = 30
+        return b.state, b.opened
+
+    assert run(scenario()) == (HALF_OPEN, 1)
+
+
+def test_timeout_counts_as_failure():
+    async def scenario():
+        b = CircuitBreaker("test-timeout", failure_threshold=2, call_timeout=0.01, clock=Clock())
+        for _ in range(2):
+            with pytest.raises(TimeoutError, match="exceeded"):
+                await b.call(lambda: asyncio.sleep(1))
+        return b.state, b.failures
+
+    assert run(scenario()) == (OPEN, 2)
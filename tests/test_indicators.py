@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from indicators import IndicatorEngine
+
+
+def candles(n: int, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    spread = close * rng.uniform(0.001, 0.02, n)
+    return close + spread, close - spread, close
+
+
+@pytest.mark.parametrize("initial", [1, 100, 600])
+def test_incremental_updates_match_full_compute(initial):
+    high, low, close = candles(initial + 300)
+    engine = IndicatorEngine()
+    _, state = engine.compute(high[:initial], low[:initial], close[:initial])
+    for h, l, c in zip(high[initial:], low[initial:], close[initial:]):
+        state = engine.update(state, h, l, c)
+    _, full = engine.compute(high, low, close)
+
+    keep = min(len(close), engine.config.level_lookback)
+    assert state.recent_close.shape[0] == keep
+    np.testing.assert_array_equal(state.recent_close, full.recent_close)
+
+    incremental, expected = engine.snapshot(state), engine.snapshot(full)
+    assert incremental.levels == expected.levels
+    assert incremental.candles == expected.candles
+    for name in ("rsi", "macd", "macd_signal", "atr", "bb_middle", "bb_upper", "bb_lower"):
+        assert getattr(incremental, name) == pytest.approx(getattr(expected, name), rel=1e-9), name
+    assert incremental.emas == pytest.approx(expected.emas, rel=1e-9)
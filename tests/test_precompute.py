@@ -0,0 +1,40 @@
+from precompute import PrecomputeScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def noop(asset):
+    pass
+
+
+def test_follow_ignores_unknown_assets_and_makes_room_for_new_ones():
+    scheduler = PrecomputeScheduler(noop, max_followed=2, known=lambda a: not a.startswith("JUNK"))
+    scheduler.follow(["junk1", "btc", "JUNK2"])
+    scheduler.follow(["eth", "sol"])
+    assert scheduler.followed() == ["ETH", "SOL"]
+
+
+def test_follows_expire_unless_renewed():
+    clock = Clock()
+    scheduler = PrecomputeScheduler(noop, follow_ttl=60, clock=clock)
+    scheduler.follow(["BTC", "ETH"])
+    clock.now = 50
+    scheduler.follow(["ETH"])
+    clock.now = 100
+    assert scheduler.followed() == ["ETH"]
+    assert "BTC" not in scheduler.plan()
+
+
+def test_unknown_assets_do_not_build_demand():
+    scheduler = PrecomputeScheduler(noop, known=lambda a: a == "BTC")
+    for _ in range(3):
+        scheduler.record_request("zzz", hit=False)
+    scheduler.record_request("btc", hit=True)
+    assert scheduler.plan() == ["BTC"]
+    assert scheduler.stats()["requests"] == 4
@@ -0,0 +1,76 @@
+import asyncio
+
+from price_hub import PriceHub
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def drain(sub):
+    messages = []
+    while not sub.queue.empty():
+        messages.append(sub.queue.get_nowait())
+    return messages
+
+
+def test_stale_flag_is_cleared_when_upstream_recovers():
+    quotes = iter([
+        {"BTC": {"usd": 1.0}},
+        {"BTC": {"usd": 1.0, "stale": True, "as_of": "2026-01-01T00:00:00+00:00"}},
+        {"BTC": {"usd": 1.1}},
+    ])
+
+    async def fetch(assets):
+        return next(quotes)
+
+    async def scenario():
+        hub = PriceHub(fetch, interval=0.01)
+        sub = hub.connect()
+        hub.subscribe(sub, ["BTC"])
+        await asyncio.sleep(0.1)
+        await hub.stop()
+        return drain(sub)
+
+    messages = run(scenario())
+    assert [m["type"] for m in messages] == ["snapshot", "update", "update"]
+    merged = {}
+    for m in messages:
+        merged.update(m["data"])
+    merged = {k: v for k, v in merged.items() if v is not None}
+    assert merged == {"usd": 1.1}
+    assert messages[2]["data"] == {"usd": 1.1, "stale": None, "as_of": None}
+
+
+def test_unknown_assets_and_global_cap_are_rejected():
+    async def fetch(assets):
+        return {}
+
+    async def scenario():
+        hub = PriceHub(fetch, interval=10, max_total_assets=2, known=lambda a: a != "JUNK")
+        first, second = hub.connect(), hub.connect()
+        added = hub.subscribe(first, ["JUNK", "BTC", "ETH"]), hub.subscribe(second, ["SOL", "BTC"])
+        await hub.stop()
+        return added, hub.stats()["rejected"]
+
+    (first, second), rejected = run(scenario())
+    assert first == ["BTC", "ETH"]
+    assert second == ["BTC"]
+    assert rejected == 2
+
+
+def test_polls_are_split_into_batches():
+    batches = []
+
+    async def fetch(assets):
+        batches.append(len(assets))
+        return {}
+
+    async def scenario():
+        hub = PriceHub(fetch, interval=10, max_assets=10, batch_size=4)
+        hub.subscribe(hub.connect(), [f"A{i}" for i in range(10)])
+        await asyncio.sleep(0.01)
+        await hub.stop()
+
+    run(scenario())
+    assert batches == [4, 4, 2]
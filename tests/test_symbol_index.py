@@ -0,0 +1,56 @@
+import pytest
+
+from symbol_index import SymbolIndex
+
+COINS = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "market_cap_rank": 1, "aliases": ["xbt"]},
+    {"id": "ethereum", "symbol": "eth", "name": "Ethereum", "market_cap_rank": 2, "aliases": ["ether"]},
+    {"id": "cardano", "symbol": "ada", "name": "Cardano", "market_cap_rank": 9},
+    {"id": "bitcoin-cash", "symbol": "bch", "name": "Bitcoin Cash", "market_cap_rank": 16},
+    {"id": "near", "symbol": "near", "name": "NEAR Protocol", "market_cap_rank": 17},
+    {"id": "optimism", "symbol": "op", "name": "Optimism", "market_cap_rank": 42},
+    {"id": "fake-bitcoin", "symbol": "btc", "name": "Fake Bitcoin", "market_cap_rank": 900},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    index = SymbolIndex()
+    index.build(COINS)
+    return index
+
+
+def symbols(index, text):
+    return [coin.symbol for coin in index.find(text)]
+
+
+def test_matches_only_at_word_boundaries(index):
+    assert symbols(index, "moving to canada next year") == []
+    assert symbols(index, "ada looks strong") == ["ADA"]
+    assert symbols(index, "ethernet cable, bitcoins") == []
+
+
+def test_common_words_and_short_tickers_need_caps_or_dollar(index):
+    assert symbols(index, "we are near the top") == []
+    assert symbols(index, "is NEAR a buy?") == ["NEAR"]
+    assert symbols(index, "thoughts on $near?") == ["NEAR"]
+    assert symbols(index, "op ed about markets") == []
+    assert symbols(index, "OP and $op") == ["OP"]
+    assert symbols(index, "near protocol roadmap") == ["NEAR"]
+
+
+def test_coins_come_in_order_of_first_mention(index):
+    assert symbols(index, "ETH vs btc, then Ethereum again and Cardano") == ["ETH", "BTC", "ADA"]
+
+
+def test_longest_match_wins(index):
+    assert symbols(index, "is Bitcoin Cash dead?") == ["BCH"]
+    assert symbols(index, "Bitcoin and Bitcoin Cash") == ["BTC", "BCH"]
+
+
+def test_resolve_prefers_best_ranked_coin(index):
+    assert index.resolve("BTC").id == "bitcoin"
+    assert index.resolve("$xbt").id == "bitcoin"
+    assert index.resolve("bitcoin-cash").symbol == "BCH"
+    assert index.resolve("nope") is None
+    assert index.coin_id("nope") == "nope"
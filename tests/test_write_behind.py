@@ -0,0 +1,91 @@
+import asyncio
+
+from pymongo.errors import DuplicateKeyError
+
+from write_behind import WriteBehindQueue
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeCollection:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.docs = []
+        self.batches = []
+
+    async def insert_many(self, docs, ordered=False):
+        await asyncio.sleep(self.delay)
+        self.batches.append(len(docs))
+        self.docs.extend(docs)
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+
+def test_flush_returns_under_steady_traffic():
+    async def scenario():
+        collection = FakeCollection(delay=0.01)
+        queue = WriteBehindQueue(lambda: collection, "test", max_batch=50, flush_interval=0.5)
+        for i in range(10):
+            await queue.put({"i": i})
+
+        async def producer():
+            i = 10
+            while True:
+                await queue.put({"i": i})
+                i += 1
+                await asyncio.sleep(0.005)
+
+        feeding = asyncio.create_task(producer())
+        try:
+            await asyncio.wait_for(queue.flush(), timeout=1)
+            written = {doc["i"] for doc in collection.docs}
+        finally:
+            feeding.cancel()
+            await queue.stop()
+        return written
+
+    assert set(range(10)) <= run(scenario())
+
+
+def test_flush_by_key_waits_only_for_that_key():
+    async def scenario():
+        collection = FakeCollection()
+        queue = WriteBehindQueue(lambda: collection, "test", max_batch=100, flush_interval=5)
+        await queue.put({"session": "a"}, key="a")
+        # Nothing is pending for "b": no forced partial batch, no waiting
+        await asyncio.wait_for(queue.flush("b"), timeout=0.1)
+        assert collection.docs == []
+        await asyncio.wait_for(queue.flush("a"), timeout=1)
+        assert collection.docs == [{"session": "a"}]
+        assert queue.pending == 0
+        await queue.stop()
+
+    run(scenario())
+
+
+def test_inline_write_tolerates_duplicates():
+    class StuckCollection(FakeCollection):
+        async def insert_many(self, docs, ordered=False):
+            await asyncio.Event().wait()
+
+        async def insert_one(self, doc):
+            raise DuplicateKeyError("E11000 duplicate key error")
+
+    async def scenario():
+        collection = StuckCollection()
+        queue = WriteBehindQueue(lambda: collection, "test", max_batch=1, max_queue=1, put_timeout=0.01)
+        await queue.put({"id": "a"})
+        await asyncio.sleep(0.01)  # the flusher takes it and hangs in insert_many
+        await queue.put({"id": "b"})  # fills the queue
+        await queue.put({"id": "b"})  # times out and is written inline
+        stats = queue.stats()
+        queue._task.cancel()
+        return stats
+
+    stats = run(scenario())
+    assert stats["inline_writes"] == 1
+    assert stats["duplicates"] == 1
+    assert stats["pending"] == 2